@@ -1,7 +1,10 @@
 from PIL import Image
 import numpy as np
 import matplotlib.cm as cm
-import math
+import hashlib
+import inspect
+import shutil
+import os
 
 ASPECT_RATIO = 1.0 / 1.0
 FRAME_HEIGHT = 8.0
@@ -10,49 +13,79 @@ FRAME_WIDTH = FRAME_HEIGHT * ASPECT_RATIO
 XRES = 1000
 YRES = 1000
 
+CACHE_DIR = "img/.cache"
+
 x_min = -FRAME_WIDTH/2
 x_max = FRAME_WIDTH/2
 y_min = -FRAME_HEIGHT/2
 y_max = FRAME_HEIGHT/2
 
-x_values = np.linspace(x_min, x_max, XRES+1)
-y_values = np.linspace(y_min, y_max, YRES+1)
 
-#print(x_values)
-#print(y_values)
+def z_squared(z):
+    # The right half plane is mirrored, as in the original z_squared.png
+    return np.where(z.real > 0, np.conj(z)**2, z**2)
+
+
+def get_grid(xres=XRES, yres=YRES):
+    '''
+    Complex value at the center of every pixel, top row first.
+    '''
+    x_values = np.linspace(x_min, x_max, xres+1)
+    y_values = np.linspace(y_min, y_max, yres+1)
+    xs = (x_values[:-1] + x_values[1:])/2
+    ys = (y_values[:-1] + y_values[1:])/2
+    return xs[None, :] + 1j * ys[::-1, None]
+
+
+def domain_color(func, xres=XRES, yres=YRES, cmap="viridis", shade=False):
+    '''
+    RGBA array with the phase of func over the grid mapped through cmap.
+    With shade=True, the brightness also cycles with log2|func(z)|,
+    which draws the magnitude contours.
+    '''
+    with np.errstate(all="ignore"):
+        w = func(get_grid(xres, yres))
+    phase = (np.angle(w) + np.pi) / (2*np.pi)
+    rgba = getattr(cm, cmap)(phase)
 
-pixels = []
+    if shade:
+        with np.errstate(all="ignore"):
+            level = np.log2(np.abs(w))
+        level = np.nan_to_num(level - np.floor(level), nan=0.0, posinf=0.0, neginf=0.0)
+        rgba[..., :3] *= (0.7 + 0.3 * level)[..., None]
 
-for i in range(len(y_values) - 1)[::-1]:
-    pixels.append([])
-    for j in range(len(x_values) - 1):
-        x1, x2 = x_values[j:j + 2]
-        y1, y2 = y_values[i:i + 2]
-        x, y = (x1 + x2)/2, (y1 + y2)/2
+    return (rgba * 255).astype(np.uint8)
 
-        if x > 0:
-            y = -y
 
-        # if -2 < x < 2 and -2 < y < 2:
-        #     pixel = [0, 0, 0]
-        # else:
-        #     pixel = [255, 255, 255]
+def get_cache_key(func, xres, yres, cmap, shade):
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        code = func.__code__
+        source = repr((code.co_code, code.co_consts, code.co_names))
+    key = f"{source}|{xres}x{yres}|{FRAME_WIDTH}x{FRAME_HEIGHT}|{cmap}|{shade}"
+    return hashlib.sha1(key.encode()).hexdigest()
 
-        z = (x+y*1j)
 
-        if z.real != 0:
-            theta = 2*(math.atan(z.imag/z.real) + np.pi/2)
-        else:
-            theta = np.pi
-        
-        pixel = [x * 255 for x in cm.viridis(theta/(2*np.pi))]
-        
-        pixels[-1].append(pixel)
+def save_domain_color(func, file_name, xres=XRES, yres=YRES, cmap="viridis", shade=False):
+    '''
+    Writes the domain coloring of func to file_name, reusing the cached
+    PNG if the same function, resolution and colormap were rendered before.
+    Returns True if the image had to be computed.
+    '''
+    key = get_cache_key(func, xres, yres, cmap, shade)
+    cached = os.path.join(CACHE_DIR, key + ".png")
 
+    computed = not os.path.exists(cached)
+    if computed:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        Image.fromarray(domain_color(func, xres, yres, cmap, shade)).save(cached)
 
+    if os.path.abspath(cached) != os.path.abspath(file_name):
+        shutil.copyfile(cached, file_name)
+    return computed
 
-array = np.array(pixels, dtype=np.uint8)
 
-new_image = Image.fromarray(array)
-new_image.save("img/z_squared.png")
-new_image.show()
+if __name__ == "__main__":
+    save_domain_color(z_squared, "img/z_squared.png")
+    Image.open("img/z_squared.png").show()
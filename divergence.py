@@ -1,4 +1,5 @@
 from manimlib.imports import *
+from vector_calculus import BatchedVectorField
 
 
 class Intro(Scene):
@@ -60,11 +61,11 @@ class FluxIntegral(Scene):
             y_max=5,
             number_line_config={"include_tip": False, }
         )
-        f = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0)
-              for x in np.arange(-5, 6, 1)
-              for y in np.arange(-5, 6, 1)
-              ]
+        f = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 6),
+            y_range=(-5, 6),
+            color_list=self.color_list
         )
 
         n = VGroup(
@@ -89,11 +90,11 @@ class FluxIntegral(Scene):
             y_max=5,
             number_line_config={"include_tip": False, }
         )
-        f2 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0)
-              for x in np.arange(-5, 6, 1)
-              for y in np.arange(-5, 6, 1)
-              ]
+        f2 = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 6),
+            y_range=(-5, 6),
+            color_list=self.color_list
         )
 
         field2 = VGroup(axes2, f2)
@@ -107,11 +108,11 @@ class FluxIntegral(Scene):
             y_max=5,
             number_line_config={"include_tip": False, }
         )
-        f3 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0)
-              for x in np.arange(-5, 6, 1)
-              for y in np.arange(-5, 6, 1)
-              ]
+        f3 = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 6),
+            y_range=(-5, 6),
+            color_list=self.color_list
         )
 
         field3 = VGroup(axes3, f3)
@@ -303,20 +304,6 @@ class FluxIntegral(Scene):
         self.play(Transform(feq, feq2))
         self.wait()
 
-    def calc_field_color(self, point, f, prop=0.0, opacity=None):
-        x, y = point[:2]
-        func = f(x, y)
-        magnitude = math.sqrt(func[0] ** 2 + func[1] ** 2)
-        func = func / magnitude if magnitude != 0 else np.array([0, 0])
-        func = func / 1.5
-        v = int(magnitude / 10 ** prop)
-        index = len(self.color_list) - 1 if v > len(self.color_list) - 1 else v
-        c = self.color_list[index]
-        v = Vector(func, color=c).shift(point)
-        if opacity:
-            v.set_fill(opacity=opacity)
-        return v
-
     @staticmethod
     def vect(x, y):
         return np.array([
@@ -368,11 +355,11 @@ class FluxExample(Scene):
             y_max=3,
             number_line_config={"include_tip": False, }
         )
-        f = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0)
-              for x in np.arange(-5, 6, 1)
-              for y in np.arange(-3, 4, 1)
-              ]
+        f = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 6),
+            y_range=(-3, 4),
+            color_list=self.color_list
         )
 
         field = VGroup(axes, f)
@@ -446,20 +433,6 @@ class FluxExample(Scene):
         self.play(Write(r1))
         self.wait()
 
-    def calc_field_color(self, point, f, prop=0.0, opacity=None):
-        x, y = point[:2]
-        func = f(x, y)
-        magnitude = math.sqrt(func[0] ** 2 + func[1] ** 2)
-        func = func / magnitude if magnitude != 0 else np.array([0, 0])
-        func = func / 1.5
-        v = int(magnitude / 10 ** prop)
-        index = len(self.color_list) - 1 if v > len(self.color_list) - 1 else v
-        c = self.color_list[index]
-        v = Vector(func, color=c).shift(point)
-        if opacity:
-            v.set_fill(opacity=opacity)
-        return v
-
     @staticmethod
     def vect(x, y):
         return np.array([
@@ -509,22 +482,22 @@ class DivDemo(Scene):
             },
         }
         axes = Axes(**axes_config)
-        f1 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.field1, prop=0)
-                for x in np.arange(-5, 5, 1)
-                for y in np.arange(-4, 5, 1)
-              ]
+        f1 = BatchedVectorField(
+            self.field1,
+            x_range=(-5, 5),
+            y_range=(-4, 5),
+            color_list=self.color_list
         )
         c = Circle(fill_color=RED, fill_opacity=0.25, color=WHITE, radius=1)
         field1 = VGroup(axes, f1, c)
         field1.scale(0.6)
 
         axes = Axes(**axes_config)
-        f2 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.field2, prop=0)
-                for x in np.arange(-5, 5, 1)
-                for y in np.arange(-4, 5, 1)
-              ]
+        f2 = BatchedVectorField(
+            self.field2,
+            x_range=(-5, 5),
+            y_range=(-4, 5),
+            color_list=self.color_list
         )
 
         c = Circle(fill_color=RED, fill_opacity=0.25, color=WHITE, radius=1)
@@ -532,11 +505,11 @@ class DivDemo(Scene):
         field2.scale(0.6)
 
         axes = Axes(**axes_config)
-        f3 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.field3, prop=0)
-                for x in np.arange(-5, 6, 1)
-                for y in np.arange(-4, 5, 1)
-              ]
+        f3 = BatchedVectorField(
+            self.field3,
+            x_range=(-5, 6),
+            y_range=(-4, 5),
+            color_list=self.color_list
         )
 
         c = Circle(fill_color=RED, fill_opacity=0.25, color=WHITE, radius=1)
@@ -579,20 +552,6 @@ class DivDemo(Scene):
         )
         self.wait()
 
-    def calc_field_color(self, point, f, prop=0.0, opacity=None):
-        x, y = point[:2]
-        func = f(x, y)
-        magnitude = math.sqrt(func[0] ** 2 + func[1] ** 2)
-        func = func / magnitude if magnitude != 0 else np.array([0, 0])
-        func = func / 1.5
-        v = int(magnitude / 10 ** prop)
-        index = len(self.color_list) - 1 if v > len(self.color_list) - 1 else v
-        c = self.color_list[index]
-        v = Vector(func, color=c).shift(point)
-        if opacity:
-            v.set_fill(opacity=opacity)
-        return v
-
     @staticmethod
     def field1(x, y):
         return np.array([
@@ -632,11 +591,11 @@ class DivTwoVisual(Scene):
         }
 
         axes = Axes(**axes_config)
-        f = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0)
-                for x in np.arange(-5, 5, 1)
-                for y in np.arange(-5, 5, 1)
-              ]
+        f = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            color_list=self.color_list
         )
 
         field = VGroup(axes, f)
@@ -648,11 +607,11 @@ class DivTwoVisual(Scene):
         )
 
         axes2 = Axes(**axes_config)
-        f2 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0)
-                for x in np.arange(-5, 5, 1)
-                for y in np.arange(-5, 5, 1)
-              ]
+        f2 = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            color_list=self.color_list
         )
         f2.set_fill(opacity=0.5)
         f2.set_stroke(opacity=0.5)
@@ -782,20 +741,6 @@ class DivTwoVisual(Scene):
         self.play(Write(eqf))
         self.wait()
 
-    def calc_field_color(self, point, f, prop=0.0, opacity=None):
-        x, y = point[:2]
-        func = f(x, y)
-        magnitude = math.sqrt(func[0] ** 2 + func[1] ** 2)
-        func = func / magnitude if magnitude != 0 else np.array([0, 0])
-        func = func / 1.5
-        v = int(magnitude / 10 ** prop)
-        index = len(self.color_list) - 1 if v > len(self.color_list) - 1 else v
-        c = self.color_list[index]
-        v = Vector(func, color=c).shift(point)
-        if opacity:
-            v.set_fill(opacity=opacity)
-        return v
-
     @staticmethod
     def func(t):
         return np.array([
@@ -1,5 +1,7 @@
 from manimlib.imports import *
-import scipy.special
+from lazy_imports import lazy_import
+
+special = lazy_import("scipy.special")
 
 
 class Intro(Scene):
@@ -543,7 +545,7 @@ class GammaFunc(Scene):
 
     @staticmethod
     def func(t):
-        val = float(scipy.special.gamma(t))
+        val = float(special.gamma(t))
         if val < 0:
             val = np.maximum(val, -4)
         elif val > 0:
@@ -697,7 +699,7 @@ class DifferIntegralOLD(Scene):
         ff.become(f)
 
     def dint(self, x, a, k=1):
-        return (scipy.special.gamma(k+1)/scipy.special.gamma(k-a+1)) * (x**(k-a))
+        return (special.gamma(k+1)/special.gamma(k-a+1)) * (x**(k-a))
 
 
 class DifferIntegral(GraphScene):
@@ -778,7 +780,7 @@ class DifferIntegral(GraphScene):
         ff.become(f)
 
     def dint(self, x, a, k=1):
-        return (scipy.special.gamma(k+1)/scipy.special.gamma(k-a+1)) * (x**(k-a))
+        return (special.gamma(k+1)/special.gamma(k-a+1)) * (x**(k-a))
 
 
 class RLProperty(Scene):
@@ -1,5 +1,9 @@
 from PIL import Image
+from multiprocessing import Pool
 import numpy as np
+import os
+import sys
+import time
 
 ASPECT_RATIO = 16.0 / 9.0
 FRAME_HEIGHT = 1.75
@@ -8,6 +12,11 @@ FRAME_WIDTH = FRAME_HEIGHT * ASPECT_RATIO
 XRES = 160
 YRES = 90
 
+NUM_STEPS = 1000
+BAILOUT = 256.0
+TILE_ROWS = 64
+TILE_SIZE = 128
+
 RED = (252, 98, 85)
 YELLOW = (255, 255, 0)
 GREEN = (131, 193, 103)
@@ -20,32 +29,149 @@ x_max = FRAME_WIDTH/2
 y_min = -FRAME_HEIGHT/2
 y_max = FRAME_HEIGHT/2
 
-x_values = np.linspace(x_min, x_max, XRES+1)
-y_values = np.linspace(y_min, y_max, YRES+1)
 
-pixels = []
+def pixel_centers(xres=XRES, yres=YRES, center=0j, frame_height=FRAME_HEIGHT):
+    '''
+    Real and imaginary parts at the center of every pixel,
+    with the rows going from the top of the frame to the bottom.
+    '''
+    if center == 0j and frame_height == FRAME_HEIGHT:
+        x_values = np.linspace(x_min, x_max, xres+1)
+        y_values = np.linspace(y_min, y_max, yres+1)
+    else:
+        w, h = frame_height * xres / yres, frame_height
+        x_values = np.linspace(center.real - w/2, center.real + w/2, xres+1)
+        y_values = np.linspace(center.imag - h/2, center.imag + h/2, yres+1)
+    xs = (x_values[:-1] + x_values[1:])/2
+    ys = (y_values[:-1] + y_values[1:])/2
+    return xs, ys[::-1]
+
+
+def in_main_bulbs(cr, ci):
+    '''
+    Points inside the main cardioid or the period 2 bulb never escape,
+    so there is no need to iterate them.
+    '''
+    ci2 = ci * ci
+    q = (cr - 0.25)**2 + ci2
+    return (q * (q + cr - 0.25) <= 0.25 * ci2) | ((cr + 1)**2 + ci2 <= 1/16)
+
+
+def escape_time(cr, ci, num_steps=NUM_STEPS, bailout=BAILOUT):
+    '''
+    Smooth iteration count for each point c = cr + ci*i, the same as
+    mandelbrot() in shaders/mandelbrot/frag.glsl. Points that never
+    escape get np.inf.
+    '''
+    cr = np.asarray(cr, dtype=np.float64)
+    ci = np.asarray(ci, dtype=np.float64)
+    shape = np.broadcast(cr, ci).shape
+    cr = np.broadcast_to(cr, shape).ravel()
+    ci = np.broadcast_to(ci, shape).ravel()
+
+    counts = np.full(cr.size, np.inf)
+    b2 = bailout * bailout
+
+    # Only the points that are still iterating are kept around
+    idx = np.flatnonzero(~in_main_bulbs(cr, ci))
+    ar, ai = cr[idx], ci[idx]
+    zr, zi = np.zeros_like(ar), np.zeros_like(ai)
+
+    for n in range(num_steps):
+        if idx.size == 0:
+            break
+        zr, zi = zr * zr - zi * zi + ar, 2.0 * zr * zi + ai
+        mag = zr * zr + zi * zi
+        done = mag > b2
+        if done.any():
+            counts[idx[done]] = n - np.log2(np.log2(mag[done])) + 4.0
+            keep = ~done
+            idx, ar, ai, zr, zi = idx[keep], ar[keep], ai[keep], zr[keep], zi[keep]
+
+    return counts.reshape(shape)
+
+
+def render_rows(xs, ys, num_steps=NUM_STEPS, tile_rows=TILE_ROWS):
+    '''
+    Escape times for the grid xs * ys, tile_rows rows at a time
+    so the working arrays stay small at 4K.
+    '''
+    counts = np.empty((len(ys), len(xs)))
+    for start in range(0, len(ys), tile_rows):
+        rows = ys[start:start + tile_rows]
+        counts[start:start + len(rows)] = escape_time(
+            xs[None, :], rows[:, None], num_steps)
+    return counts
+
+
+_grid = {}
+
+
+def _init_worker(xs, ys, num_steps):
+    _grid["xs"], _grid["ys"], _grid["num_steps"] = xs, ys, num_steps
+
+
+def _render_tile(tile):
+    r0, r1, c0, c1 = tile
+    start = time.perf_counter()
+    counts = escape_time(
+        _grid["xs"][None, c0:c1], _grid["ys"][r0:r1, None], _grid["num_steps"])
+    return tile, counts, os.getpid(), time.perf_counter() - start
+
+
+def get_tiles(xres, yres, tile_size=TILE_SIZE):
+    return [
+        (r, min(r + tile_size, yres), c, min(c + tile_size, xres))
+        for r in range(0, yres, tile_size)
+        for c in range(0, xres, tile_size)
+    ]
+
+
+def render_tiled(xs, ys, num_steps=NUM_STEPS, workers=None, tile_size=TILE_SIZE, report=True):
+    '''
+    Same result as render_rows, but the frame is cut into small tiles
+    that are handed out to a process pool one at a time, so workers that
+    get cheap tiles far from the set just pick up more of them.
+    '''
+    counts = np.empty((len(ys), len(xs)))
+    stats = {}
+    start = time.perf_counter()
+
+    with Pool(workers, _init_worker, (xs, ys, num_steps)) as pool:
+        tiles = get_tiles(len(xs), len(ys), tile_size)
+        for (r0, r1, c0, c1), tile_counts, pid, elapsed in pool.imap_unordered(_render_tile, tiles):
+            counts[r0:r1, c0:c1] = tile_counts
+            pixels, busy, n = stats.get(pid, (0, 0.0, 0))
+            stats[pid] = (pixels + tile_counts.size, busy + elapsed, n + 1)
+
+    if report:
+        total = time.perf_counter() - start
+        for i, (pid, (pixels, busy, n)) in enumerate(sorted(stats.items())):
+            print(f"worker {i} (pid {pid}): {n} tiles, {pixels} px, "
+                  f"{pixels / max(busy, 1e-9):,.0f} px/s")
+        print(f"total: {counts.size} px in {total:.2f}s, {counts.size / total:,.0f} px/s")
+
+    return counts
+
 
-for i in range(len(y_values) - 1)[::-1]:
-    pixels.append([])
-    for j in range(len(x_values) - 1):
-        x1, x2 = x_values[j:j + 2]
-        y1, y2 = y_values[i:i + 2]
+def to_pixels(counts):
+    inside = np.isinf(counts)
+    array = np.zeros(counts.shape + (3,), dtype=np.uint8)
+    array[inside] = 255
+    return array
 
-        x, y = (x1 + x2)/2, (y1 + y2)/2
-        c = x + y*1j
-        
-        z, done = 0, False
-        for _ in range(1000):
-            if np.sqrt(z.imag**2 + z.real**2) > 2:
-                done = True
-                break
-            z = z**2 + c
-        pixel = (255, 255, 255) if not done else (0, 0, 0)
-        pixels[-1].append(pixel)
 
+if __name__ == "__main__":
+    xres, yres = XRES, YRES
+    if len(sys.argv) > 2:
+        xres, yres = int(sys.argv[1]), int(sys.argv[2])
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 1
 
-array = np.array(pixels, dtype=np.uint8)
+    if workers > 1:
+        counts = render_tiled(*pixel_centers(xres, yres), workers=workers)
+    else:
+        counts = render_rows(*pixel_centers(xres, yres))
 
-new_image = Image.fromarray(array)
-new_image.save("img/mandelbrot.png")
-new_image.show()
+    new_image = Image.fromarray(to_pixels(counts))
+    new_image.save("img/mandelbrot.png")
+    new_image.show()
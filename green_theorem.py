@@ -1,4 +1,5 @@
 from manimlib.imports import *
+from vector_calculus import BatchedVectorField
 
 
 class Intro(Scene):
@@ -53,22 +54,23 @@ class Setup(Scene):
                        }
 
         axes = Axes(**axes_config)
-        f = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0)
-              for x in np.arange(-5, 5, 1)
-              for y in np.arange(-5, 5, 1)
-              ]
+        f = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            color_list=self.color_list
         )
 
         field = VGroup(axes, f)
         # field.scale(0.6)
 
         axes2 = Axes(**axes_config)
-        f2 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0).set_fill(opacity=0.5)
-              for x in np.arange(-5, 5, 1)
-              for y in np.arange(-5, 5, 1)
-              ]
+        f2 = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            opacity=0.5,
+            color_list=self.color_list
         )
 
         field2 = VGroup(axes, f2)
@@ -114,20 +116,6 @@ class Setup(Scene):
         self.play(Write(surface))
         self.wait()
 
-    def calc_field_color(self, point, f, prop=0.0, opacity=None):
-        x, y = point[:2]
-        func = f(x, y)
-        magnitude = math.sqrt(func[0] ** 2 + func[1] ** 2)
-        func = func / magnitude if magnitude != 0 else np.array([0, 0])
-        func = func / 1.5
-        v = int(magnitude / 10 ** prop)
-        index = len(self.color_list) - 1 if v > len(self.color_list) - 1 else v
-        c = self.color_list[index]
-        v = Vector(func, color=c).shift(point)
-        if opacity:
-            v.set_fill(opacity=opacity)
-        return v
-
     @staticmethod
     def vect(x, y):
         return np.array([
@@ -186,22 +174,22 @@ class CurlDemo(Scene):
                        }
 
         axes = Axes(**axes_config)
-        f1 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.field1, prop=0)
-              for x in np.arange(-5, 5, 1)
-              for y in np.arange(-5, 5, 1)
-              ]
+        f1 = BatchedVectorField(
+            self.field1,
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            color_list=self.color_list
         )
         c = Circle(fill_color=RED, fill_opacity=0.25, color=WHITE, radius=1)
         field1 = VGroup(axes, f1, c)
         field1.scale(0.6)
 
         axes = Axes(**axes_config)
-        f2 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.field2, prop=0)
-              for x in np.arange(-5, 5, 1)
-              for y in np.arange(-5, 5, 1)
-              ]
+        f2 = BatchedVectorField(
+            self.field2,
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            color_list=self.color_list
         )
 
         c = Circle(fill_color=RED, fill_opacity=0.25, color=WHITE, radius=1)
@@ -209,11 +197,11 @@ class CurlDemo(Scene):
         field2.scale(0.6)
 
         axes = Axes(**axes_config)
-        f3 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.field3, prop=0)
-              for x in np.arange(-5, 5, 1)
-              for y in np.arange(-5, 5, 1)
-              ]
+        f3 = BatchedVectorField(
+            self.field3,
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            color_list=self.color_list
         )
 
         c = Circle(fill_color=RED, fill_opacity=0.25, color=WHITE, radius=1)
@@ -246,20 +234,6 @@ class CurlDemo(Scene):
         )
         self.wait()
 
-    def calc_field_color(self, point, f, prop=0.0, opacity=None):
-        x, y = point[:2]
-        func = f(x, y)
-        magnitude = math.sqrt(func[0] ** 2 + func[1] ** 2)
-        func = func / magnitude if magnitude != 0 else np.array([0, 0])
-        func = func / 1.5
-        v = int(magnitude / 10 ** prop)
-        index = len(self.color_list) - 1 if v > len(self.color_list) - 1 else v
-        c = self.color_list[index]
-        v = Vector(func, color=c).shift(point)
-        if opacity:
-            v.set_fill(opacity=opacity)
-        return v
-
     @staticmethod
     def field1(x, y):
         return np.array([
@@ -328,22 +302,23 @@ class GreenTheoremVisual(Scene):
                        }
 
         axes = Axes(**axes_config)
-        f = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0)
-              for x in np.arange(-5, 5, 1)
-              for y in np.arange(-5, 5, 1)
-              ]
+        f = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            color_list=self.color_list
         )
 
         field = VGroup(axes, f)
         # field.scale(0.6)
 
         axes2 = Axes(**axes_config)
-        f2 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, self.vect, prop=0).set_fill(opacity=0.5)
-              for x in np.arange(-5, 5, 1)
-              for y in np.arange(-5, 5, 1)
-              ]
+        f2 = BatchedVectorField(
+            self.vect,
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            opacity=0.5,
+            color_list=self.color_list
         )
 
         field2 = VGroup(axes, f2)
@@ -486,20 +461,6 @@ class GreenTheoremVisual(Scene):
         self.play(Write(eqf))
         self.wait()
 
-    def calc_field_color(self, point, f, prop=0.0, opacity=None):
-        x, y = point[:2]
-        func = f(x, y)
-        magnitude = math.sqrt(func[0] ** 2 + func[1] ** 2)
-        func = func / magnitude if magnitude != 0 else np.array([0, 0])
-        func = func / 1.5
-        v = int(magnitude / 10 ** prop)
-        index = len(self.color_list) - 1 if v > len(self.color_list) - 1 else v
-        c = self.color_list[index]
-        v = Vector(func, color=c).shift(point)
-        if opacity:
-            v.set_fill(opacity=opacity)
-        return v
-
     @staticmethod
     def func(t):
         return np.array([
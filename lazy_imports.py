@@ -0,0 +1,47 @@
+'''
+Modules and functions that are only imported the first time they are
+used, so loading a module to render one of its title cards doesn't pay
+for scipy, mpmath or gym:
+
+    mpmath = lazy_import("mpmath")
+    curve_fit = lazy_function("scipy.optimize", "curve_fit")
+
+A module that isn't installed only fails when it's used.
+'''
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    '''
+    Stands in for the module name until one of its attributes is looked
+    up, then imports it and takes over its namespace, so later lookups
+    cost the same as on the module itself.
+    '''
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module '{self.__name__}'>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def lazy_function(module_name, name):
+    '''
+    The function name of module_name, imported when it's first called.
+    '''
+    function = None
+
+    def call(*args, **kwargs):
+        nonlocal function
+        if function is None:
+            function = getattr(importlib.import_module(module_name), name)
+        return function(*args, **kwargs)
+    call.__name__ = call.__qualname__ = name
+    call.__module__ = module_name
+    return call
@@ -1,4 +1,5 @@
 from manimlib.imports import *
+from vector_calculus import BatchedVectorField, StreamingLineIntegral
 
 
 class Positron(Circle):
@@ -660,17 +661,18 @@ class LineIntegralVector(Scene):
                     }
 
         axes = Axes(**axes_config)
-        f = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, lambda x, y: np.array([y, x]), prop=0)
-              for x in np.arange(-5, 5, 1)
-              for y in np.arange(-5, 5, 1)
-              ]
+        f = BatchedVectorField(
+            lambda x, y: np.array([y, x]),
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            color_list=self.color_list
         )
-        f2 = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, lambda x, y: np.array([y, x]), prop=0, opacity=0.5)
-              for x in np.arange(-5, 5, 1)
-              for y in np.arange(-5, 5, 1)
-              ]
+        f2 = BatchedVectorField(
+            lambda x, y: np.array([y, x]),
+            x_range=(-5, 5),
+            y_range=(-5, 5),
+            opacity=0.5,
+            color_list=self.color_list
         )
         f2.scale(0.6)
         f2.shift(1 * UP)
@@ -755,8 +757,14 @@ class LineIntegralVector(Scene):
         s2 = TexMobject(
             r"\int_a^b \overrightarrow{\textbf{F}} ( \overrightarrow{r} (t) ) \bullet \overrightarrow{r}'(t)")
 
-        self.f = VGroup()
-        self.a = VGroup()
+        self.integral = StreamingLineIntegral(
+            self.func,
+            lambda x, y: np.array([y, x]),
+            t_min=-3,
+            t_max=3,
+            origin=2 * LEFT + 3 * DOWN,
+            scale_factor=0.25,
+        )
 
         self.play(Write(integral))
 
@@ -789,6 +797,7 @@ class LineIntegralVector(Scene):
         self.r_ = v
         self.t = -3
         self.always_continually_update = True
+        self.add(self.integral)
 
         self.wait(10)
         
@@ -803,8 +812,7 @@ class LineIntegralVector(Scene):
             Uncreate(field),
             Uncreate(curve),
             Uncreate(circle),
-            Uncreate(self.f),
-            Uncreate(self.a)
+            Uncreate(self.integral)
         )
 
         self.play(Write(s1))
@@ -813,20 +821,6 @@ class LineIntegralVector(Scene):
         self.play(Transform(s1, s2))
         self.wait()
 
-    def calc_field_color(self, point, f, prop=0.0, opacity=None):
-        x, y = point[:2]
-        func = f(x, y)
-        magnitude = math.sqrt(func[0] ** 2 + func[1] ** 2)
-        func = func / magnitude if magnitude != 0 else np.array([0, 0])
-        func = func / 1.5
-        v = int(magnitude / 10 ** prop)
-        index = len(self.color_list) - 1 if v > len(self.color_list) - 1 else v
-        c = self.color_list[index]
-        v = Vector(func, color=c).shift(point)
-        if opacity:
-            v.set_fill(opacity=opacity)
-        return v
-
     @staticmethod
     def func(t):
         return np.array([
@@ -872,27 +866,7 @@ class LineIntegralVector(Scene):
             self.fr.put_start_and_end_on(self.fr.get_start(), (self.f_r(t) * 0.25) + self.fr.get_start())
             self.v2.put_start_and_end_on(self.v2.get_start(), (self.func(t) * 0.25) + self.v2.get_start())
 
-            l2 = Line(
-                (3 - self.line_evaluated(t)[1]) * DOWN + (2 - t) * LEFT,
-                3 * DOWN + (2 - t) * LEFT,
-                color=YELLOW,
-                stroke_width=dt
-            )
-            self.a.add(l2)
-            self.add(
-                l2
-            )
-
-            l1 = Line(
-                (3 - self.line_evaluated(t)[1]) * DOWN + (2 - t) * LEFT,
-                (3 - self.line_evaluated(t + dt)[1]) * DOWN + (2 - t - dt) * LEFT,
-                color=RED,
-                stroke_width=8
-            )
-            self.f.add(l1)
-            self.add(
-                l1
-            )
+            self.integral.set_t(t + dt)
 
             if self.t >= 3:
                 del self.r
@@ -1,6 +1,31 @@
+import os
+
 import manimlib
 
 if __name__ == "__main__":
+    # Set by render_all.py -p
+    if os.environ.get("RENDER_PROFILE"):
+        from render_profiles import install_profile
+        install_profile(os.environ["RENDER_PROFILE"])
+    # Set by render_all.py --profiling
+    if os.environ.get("SCENE_PROFILING"):
+        from scene_profiler import install_profiler
+        install_profiler()
+    # Set by render_all.py --mobject-stats
+    if os.environ.get("MOBJECT_STATS"):
+        from mobject_stats import install_mobject_stats, parse_budgets
+        install_mobject_stats(parse_budgets(os.environ.get("MOBJECT_BUDGETS", "")))
+    # Finds tex compiled by earlier renders without asking the disk each time
+    from scene_runner import install_tex_cache
+    tex_cache = install_tex_cache()
+    # Set to use scene_runner.py's asset cache, e.g. ASSET_CACHE=1
+    asset_cache = None
+    if os.environ.get("ASSET_CACHE"):
+        from scene_runner import install_asset_cache
+        asset_cache = install_asset_cache()
     manimlib.main()
+    tex_cache.print_report()
+    if asset_cache is not None:
+        asset_cache.print_report()
 else:
-    manimlib.stream_starter.start_livestream()
\ No newline at end of file
+    manimlib.stream_starter.start_livestream()
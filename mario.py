@@ -1,5 +1,7 @@
 from manimlib.imports import *
-from scipy.optimize import curve_fit
+from lazy_imports import lazy_function
+
+curve_fit = lazy_function("scipy.optimize", "curve_fit")
 
 
 def yx2features(ran=[0, 5], number=100):
@@ -0,0 +1,216 @@
+'''
+How big the scene is on every frame: how many mobjects it holds, how
+many points they have between them and how deeply they nest. Any play
+or wait that goes over BUDGETS is reported with the lines that built
+most of it, so Riemann sums with dx=0.01 or dense vector fields show up
+before the render crawls. Works with either manim. Every scene rendered
+writes STATS_DIR/<module>.<Scene>.json.
+
+Budgets are changed for every scene with --mobject-budget or
+MOBJECT_BUDGETS, e.g. "submobjects=5000,points=1e6", or for one scene
+with a mobject_budgets dict in its CONFIG.
+'''
+import json
+import os
+import sys
+from functools import wraps
+
+from scene_profiler import get_caller_location
+
+STATS_DIR = os.path.join("render_logs", "mobject_stats")
+BUDGETS = {
+    "submobjects": 2000,
+    "points": 200000,
+    "depth": 8,
+}
+# Lines inside these are where a mobject class is defined, not used
+CONSTRUCTORS = ("__init__", "init_points", "generate_points")
+
+
+def parse_budgets(text):
+    '''
+    {"submobjects": 5000, "points": 1000000} from "submobjects=5000,points=1e6".
+    '''
+    budgets = {}
+    for item in filter(None, text.replace(" ", "").split(",")):
+        name, value = item.split("=")
+        if name not in BUDGETS:
+            raise ValueError(f"Unknown mobject budget {name}, the budgets are {', '.join(BUDGETS)}")
+        budgets[name] = int(float(value))
+    return budgets
+
+
+def get_points(mobject):
+    # manimgl keeps them in data, the cairo manim in points
+    points = mobject.__dict__.get("points")
+    if points is None:
+        points = mobject.get_points()
+    return len(points)
+
+
+def measure(mobjects):
+    '''
+    Submobject count, point count and family depth of mobjects, and the
+    share each constructing line has of them. Depth goes to the line that
+    built the deepest of mobjects.
+    '''
+    seen = set()
+    lines = {}
+    submobjects = points = depth = 0
+    stack = [(m, 1, m.__dict__.get("created_at", "?")) for m in mobjects]
+    while stack:
+        mobject, level, root = stack.pop()
+        if id(mobject) in seen:
+            continue
+        seen.add(id(mobject))
+        n = get_points(mobject)
+        submobjects += 1
+        points += n
+        line = lines.setdefault(mobject.__dict__.get("created_at", "?"), [0, 0, 0])
+        line[0] += 1
+        line[1] += n
+        if level > depth:
+            depth = level
+            lines.setdefault(root, [0, 0, 0])[2] = level
+        stack.extend((sub, level + 1, root) for sub in mobject.submobjects)
+    return dict(submobjects=submobjects, points=points, depth=depth), lines
+
+
+class MobjectStats(object):
+    def __init__(self, budgets=None, directory=STATS_DIR):
+        self.budgets = dict(BUDGETS, **(budgets or {}))
+        self.directory = directory
+        self.frames = []
+        self.plays = []
+        self.peak = None
+
+    def sample(self, scene):
+        stats, lines = measure(scene.mobjects)
+        self.frames.append([stats[name] for name in BUDGETS])
+        if self.peak is not None:
+            for name, value in stats.items():
+                if value > self.peak[name][0]:
+                    self.peak[name] = (value, lines)
+
+    def play(self, scene, kind, method, args, kwargs):
+        if self.peak is not None:
+            # A wait run by a play is part of it
+            return method(*args, **kwargs)
+        location = get_caller_location()
+        self.peak = {name: (0, {}) for name in BUDGETS}
+        frames = len(self.frames)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            # Plays skipped with -s or -n don't update frames
+            if len(self.frames) == frames:
+                self.sample(scene)
+            self.end_play(scene, kind, location)
+
+    def end_play(self, scene, kind, location):
+        budgets = dict(self.budgets, **getattr(scene, "mobject_budgets", {}))
+        play = dict(
+            index=len(self.plays),
+            kind=kind,
+            location=location,
+            over_budget=[],
+            **{name: value for name, (value, _) in self.peak.items()},
+        )
+        for name, (value, lines) in self.peak.items():
+            if value <= budgets[name]:
+                continue
+            play["over_budget"].append(name)
+            column = list(BUDGETS).index(name)
+            top = sorted(lines.items(), key=lambda l: -l[1][column])[:1 if name == "depth" else 3]
+            play[f"{name}_by_line"] = {line: counts[column] for line, counts in top}
+            culprits = ", mostly from " + ", ".join(
+                f"{line} ({counts[column]})" for line, counts in top)
+            print(
+                f"Mobject budget: {kind} {play['index']} at {location} reaches "
+                f"{value} {name} (budget {budgets[name]}){culprits}",
+                file=sys.stderr,
+            )
+        self.plays.append(play)
+        self.peak = None
+
+    def begin_scene(self, scene):
+        self.frames = []
+        self.plays = []
+
+    def end_scene(self, scene):
+        name = f"{type(scene).__module__}.{type(scene).__name__}"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name + ".json"), "w") as f:
+            json.dump({
+                "scene": name,
+                "budgets": dict(self.budgets, **getattr(scene, "mobject_budgets", {})),
+                "plays": self.plays,
+                "columns": list(BUDGETS),
+                "frames": self.frames,
+            }, f)
+        over = [p for p in self.plays if p["over_budget"]]
+        if over:
+            print(f"Mobject budget: {len(over)} of {len(self.plays)} plays of {name} "
+                  f"over budget, see {self.directory}", file=sys.stderr)
+
+
+def install_mobject_stats(budgets=None, directory=STATS_DIR):
+    '''
+    Measures every scene run from now on, on every frame, with whichever
+    manim is installed.
+    '''
+    from manimlib.mobject.mobject import Mobject
+    from manimlib.scene.scene import Scene
+
+    stats = MobjectStats(budgets, directory)
+
+    init = Mobject.__init__
+
+    @wraps(init)
+    def recorded_init(self, *args, **kwargs):
+        if "created_at" not in self.__dict__:
+            self.created_at = get_caller_location(CONSTRUCTORS)
+        init(self, *args, **kwargs)
+    Mobject.__init__ = recorded_init
+
+    def measure_scene(scene):
+        update_frame = scene.update_frame
+
+        @wraps(update_frame)
+        def measured_update_frame(*args, **kwargs):
+            result = update_frame(*args, **kwargs)
+            if stats.peak is not None:
+                stats.sample(scene)
+            return result
+        scene.update_frame = measured_update_frame
+        for kind in ("play", "wait"):
+            method = getattr(scene, kind)
+            setattr(scene, kind, wraps(method)(
+                lambda *a, _m=method, _k=kind, **k: stats.play(scene, _k, _m, a, k)))
+
+    if hasattr(Scene, "run"):
+        run = Scene.run
+
+        @wraps(run)
+        def measured_run(self):
+            measure_scene(self)
+            stats.begin_scene(self)
+            try:
+                return run(self)
+            finally:
+                stats.end_scene(self)
+        Scene.run = measured_run
+    else:
+        # The cairo Scene renders from __init__
+        scene_init = Scene.__init__
+
+        @wraps(scene_init)
+        def measured_init(self, *args, **kwargs):
+            measure_scene(self)
+            stats.begin_scene(self)
+            try:
+                return scene_init(self, *args, **kwargs)
+            finally:
+                stats.end_scene(self)
+        Scene.__init__ = measured_init
+    return stats
@@ -1,4 +1,5 @@
 from manimlib.imports import *
+from vector_calculus import BatchedVectorField
 
 
 class LinEQ(Scene):
@@ -212,11 +213,11 @@ class BannerE(Scene):
                        }
 
         axes = Axes(**axes_config)
-        f = VGroup(
-            *[self.calc_field_color(x * RIGHT + y * UP, lambda x, y: np.array([y, x]), prop=0)
-              for x in np.arange(-5, 6, 1)
-              for y in np.arange(-5, 6, 1)
-              ]
+        f = BatchedVectorField(
+            lambda x, y: np.array([y, x]),
+            x_range=(-5, 6),
+            y_range=(-5, 6),
+            color_list=self.color_list
         )
 
         field = VGroup(axes, f)
@@ -245,20 +246,6 @@ class BannerE(Scene):
         self.play(Write(everything))  # , Write(t))
         self.wait()
 
-    def calc_field_color(self, point, f, prop=0.0, opacity=None):
-        x, y = point[:2]
-        func = f(x, y)
-        magnitude = math.sqrt(func[0] ** 2 + func[1] ** 2)
-        func = func / magnitude if magnitude != 0 else np.array([0, 0])
-        func = func / 1.5
-        v = int(magnitude / 10 ** prop)
-        index = len(self.color_list) - 1 if v > len(self.color_list) - 1 else v
-        c = self.color_list[index]
-        v = Vector(func, color=c, stroke_width=30).shift(point)
-        if opacity:
-            v.set_fill(opacity=opacity)
-        return v
-
     @staticmethod
     def func(t):
         return np.array([
@@ -1,5 +1,7 @@
 from manimlib.imports import *
-import gym
+from lazy_imports import lazy_import
+
+gym = lazy_import("gym")
 
 
 class Intro(Scene):
@@ -1,19 +1,63 @@
 from manimlib.imports import *
-from scipy.special import expi
-from scipy.integrate import quad
-from mpmath import *
-from mpmath.libmp.libintmath import moebius
+from lazy_imports import lazy_function, lazy_import
+from zeta_zeros import ZEROS_TABLE, load_zeros
+
+# Only imported by the scenes that use them, not by the title cards
+mpmath = lazy_import("mpmath")
+scipy_integrate = lazy_import("scipy.integrate")
+expi = lazy_function("scipy.special", "expi")
+exp1 = lazy_function("scipy.special", "exp1")
+moebius = lazy_function("mpmath.libmp.libintmath", "moebius")
+zeta = lazy_function("mpmath", "zeta")
+gamma = lazy_function("mpmath", "gamma")
+primepi = lazy_function("mpmath", "primepi")
+
+
+class PrimeSieve:
+    """
+    Segmented sieve of Eratosthenes. The primes found so far are kept
+    in a sorted array, so pi(x) is a binary search. When a larger x is
+    asked for, the sieve grows by whole segments until it covers it.
+    """
+    segment_size = 2**18
+
+    def __init__(self):
+        self.limit = 1
+        self.primes = np.array([], dtype=np.int64)
+
+    def extend(self, n):
+        while self.limit < n:
+            lo = self.limit + 1
+            hi = lo + self.segment_size
+            is_prime = np.ones(hi - lo, dtype=bool)
+
+            if lo == 2:
+                # First segment, the base primes come from the segment itself
+                for p in range(2, math.isqrt(hi - 1) + 1):
+                    if is_prime[p - lo]:
+                        is_prime[p * p - lo::p] = False
+            else:
+                for p in self.primes[:np.searchsorted(self.primes, math.isqrt(hi - 1), side="right")]:
+                    p = int(p)
+                    start = max(p * p, -(-lo // p) * p)
+                    is_prime[start - lo::p] = False
+
+            self.primes = np.concatenate(
+                [self.primes, np.flatnonzero(is_prime).astype(np.int64) + lo])
+            self.limit = hi - 1
+
+    def count(self, x):
+        x = int(x)
+        if x > self.limit:
+            self.extend(max(x, 2 * self.limit))
+        return int(np.searchsorted(self.primes, x, side="right"))
 
 
 class PrimeMethods:
     def count_prime(self, x):
-        counter = 0
-
-        for i in range(2, int(x) + 1):
-            if self.isPrime(i):
-                counter += 1
-
-        return counter
+        if not hasattr(self, "prime_sieve"):
+            self.prime_sieve = PrimeSieve()
+        return self.prime_sieve.count(x)
 
     def isPrime(self, x):
         for i in range(2, int(x/2) + 1):
@@ -33,41 +77,107 @@ class PrimeMethods:
     def _riemann_int(self, t):
         return 1/(t * (t**2 - 1)*math.log(t))
 
-    def j_zeros(self, x, zz):
-        x = float(x)
-        zz = [mpc(0.5, float(y)) for y in zz]
-        summ = sum([ei(z*log(x)) + ei((1-z)*log(x)) for z in zz])
-        summ = summ.real
-
-        def f(t): return 1.0/log(t)/t/(t**2-1)
-        integral = quad(f, [x, inf])
-
-        return li(x) - summ + integral - log(2)
-
-    def pi_zeros(self, x, zz):
-        x = float(x)
-        sup_lim = int(log(x)/log(2.0)) + 2
-        summatory = mpf(0)
-        for n in range(1, sup_lim+1):
-            n = mpf(n)
-            jn = self.j_zeros(power(x, 1.0/n), zz)
-            mu = moebius(n)
-            summatory += mu*jn/n
-        return summatory
-
-    def single_pi(self, x, num_zeros, zeros_file):
-        f = open(zeros_file)
-        nzeros = []
-        i = 1
-        for l in f:
-            if i > num_zeros:
-                break
-            nzeros.append(mpf(l.strip()))
-            i += 1
-        return self.pi_zeros(x, nzeros)
-
-    def riemann_count(self, x, num_zeros=35):
-        return float(self.single_pi(x, num_zeros, "zeros.txt"))
+    def riemann_count(self, x, num_zeros=35, dps=None):
+        return float(get_explicit_formula(dps).evaluate([x], num_zeros)[0])
+
+    def riemann_count_batch(self, xs, num_zeros=35, dps=None):
+        return get_explicit_formula(dps).evaluate(xs, num_zeros)
+
+
+class ExplicitFormula:
+    """
+    pi(x) from Riemann's explicit formula with the first num_zeros zeros.
+    Everything that depends only on x is kept between calls, and the sum
+    over zeros is stored as a running sum, so stepping num_zeros up in an
+    animation only evaluates the terms of the new zeros.
+
+    With dps=None everything is done in double precision with scipy,
+    which is plenty for plotting. Otherwise mpmath is used with dps digits.
+    """
+
+    def __init__(self, dps=None, zeros_table=ZEROS_TABLE):
+        self.dps = dps
+        self.zeros_table = zeros_table
+        self.base = {}
+        self.zero_sums = {}
+        self.cache = {}
+
+    def get_base(self, y):
+        # li(y) + int_y^inf dt / (t (t^2 - 1) log t) - log 2
+        if y not in self.base:
+            if self.dps is None:
+                integral = scipy_integrate.quad(
+                    lambda t: 1.0 / (t * (t * t - 1) * math.log(t)), y, np.inf)[0]
+                self.base[y] = expi(math.log(y)) + integral - math.log(2)
+            else:
+                with mpmath.workdps(self.dps):
+                    def f(t): return 1.0/mpmath.log(t)/t/(t**2-1)
+                    self.base[y] = float(
+                        mpmath.li(y) + mpmath.quad(f, [y, mpmath.inf]) - mpmath.log(2))
+        return self.base[y]
+
+    def get_zero_terms(self, ys, gammas):
+        # Ei(rho log y) + Ei((1 - rho) log y) = 2 Re Ei(rho log y) on the critical line
+        if self.dps is None:
+            w = np.log(ys)[:, None] * (0.5 + 1j * gammas[None, :])
+            return -2 * exp1(-w).real
+        with mpmath.workdps(self.dps):
+            return np.array([
+                [2 * float(mpmath.ei(mpmath.mpc(0.5, g) * mpmath.log(y)).real) for g in gammas]
+                for y in ys
+            ]).reshape(len(ys), len(gammas))
+
+    def get_zero_sums(self, ys, num_zeros):
+        # Group the ys by how many zeros they already have, so each group
+        # is extended with a single batched call
+        groups = {}
+        for y in ys:
+            sums = self.zero_sums.setdefault(y, np.zeros(1))
+            if len(sums) <= num_zeros:
+                groups.setdefault(len(sums) - 1, []).append(y)
+
+        for start, group in groups.items():
+            gammas = load_zeros(num_zeros, self.zeros_table)[start:]
+            terms = self.get_zero_terms(np.array(group), gammas)
+            for y, row in zip(group, terms):
+                self.zero_sums[y] = np.concatenate([
+                    self.zero_sums[y], self.zero_sums[y][-1] + np.cumsum(row)])
+
+        return np.array([self.zero_sums[y][num_zeros] for y in ys])
+
+    def evaluate(self, xs, num_zeros=35):
+        num_zeros = int(num_zeros)
+        xs = [float(x) for x in np.atleast_1d(xs)]
+        todo = sorted(set(x for x in xs if (x, num_zeros) not in self.cache))
+
+        if todo:
+            # pi(x) = sum of mu(n)/n J(x^(1/n))
+            terms = []
+            for x in todo:
+                sup_lim = int(math.log(x)/math.log(2.0)) + 2
+                for n in range(1, sup_lim + 1):
+                    mu = moebius(n)
+                    if mu != 0:
+                        terms.append((x, mu / n, x**(1.0/n)))
+
+            ys = sorted(set(y for _, _, y in terms))
+            zero_sums = dict(zip(ys, self.get_zero_sums(ys, num_zeros)))
+            totals = dict.fromkeys(todo, 0.0)
+            for x, weight, y in terms:
+                totals[x] += weight * (self.get_base(y) - zero_sums[y])
+            for x in todo:
+                self.cache[(x, num_zeros)] = totals[x]
+
+        return np.array([self.cache[(x, num_zeros)] for x in xs])
+
+
+_explicit_formulas = {}
+
+
+def get_explicit_formula(dps=None):
+    if dps not in _explicit_formulas:
+        _explicit_formulas[dps] = ExplicitFormula(dps)
+    return _explicit_formulas[dps]
 
 
 class PartScene(Scene):
@@ -1082,11 +1192,7 @@ class RiemannExplicit(GraphScene, PrimeMethods):
             f1.add(f)
             x = next_x
 
-        f2 = self.get_graph(
-            lambda x: self.riemann_count(x, num_zeros=0),
-            color=YELLOW,
-            x_min=2
-        )
+        f2 = self.get_riemann_graph(0)
 
         text = TexMobject(r"\text{Zeros: } 0")
         text.scale(1.25)
@@ -1099,14 +1205,19 @@ class RiemannExplicit(GraphScene, PrimeMethods):
                   UpdateFromAlphaFunc(text, self.text_update),
                   run_time=4, rate_func=linear)
 
-    def func_update(self, func, dt):
-        x = interpolate(0, 35, dt)
-        f2 = self.get_graph(
-            lambda y: self.riemann_count(y, num_zeros=x),
+    def get_riemann_graph(self, num_zeros, x_min=2, samples=101):
+        # Every point the graph samples, at its step of 0.01, in one batch
+        xs = np.linspace(x_min, self.x_max, samples)
+        ys = self.riemann_count_batch(xs, num_zeros=num_zeros)
+        return self.get_graph(
+            lambda x: np.interp(x, xs, ys),
             color=YELLOW,
-            x_min=2
+            x_min=x_min
         )
-        func.become(f2)
+
+    def func_update(self, func, dt):
+        x = interpolate(0, 35, dt)
+        func.become(self.get_riemann_graph(x))
 
     def text_update(self, tex, dt):
         x = interpolate(0, 35, dt)
@@ -1,20 +1,399 @@
+import argparse
+import fnmatch
+import json
+import os
+import shlex
+import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-with open(sys.argv[1], "r") as f:
-    code = f.read()
-
-li = []
-ind = 0
-while(True):
-    ind = code.find("class", ind+1)
-    if ind == -1:
-        break
-    head = code[ind+6:code.find(":", ind+7)]
-    if head.find("(") == -1:
-        li.append(head)
+from render_profiles import PROFILES
+from scene_profiler import PROFILE_DIR, aggregate, print_aggregate
+from scene_index import get_index
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(ROOT, "render_logs")
+ESTIMATES_LOG = os.path.join(LOG_DIR, "estimates.csv")
+RENDER_CACHE = os.path.join(ROOT, ".render_cache.json")
+APPROVALS = os.path.join(ROOT, ".render_approvals.json")
+FPS = 60
+# What the three manims write a scene to, named after it
+OUTPUT_EXTENSIONS = (".mp4", ".mov", ".gif", ".png")
+# Frame rates of the quality flags of the three manims
+QUALITY_FPS = {
+    "-l": 15, "--low_quality": 15, "-ql": 15,
+    "-m": 30, "--medium_quality": 30, "-qm": 30,
+    "--hd": 30, "--high_quality": 60, "-qh": 60, "-qp": 60, "-qk": 60, "--uhd": 60,
+}
+
+
+def select_scenes(index, files=None, bases=None, patterns=None):
+    modules = None
+    if files:
+        modules = []
+        for f in files:
+            module = index.get_module_name(f)
+            if module is None:
+                print(f"Skipping {f}: not a module of the repo", file=sys.stderr)
+            else:
+                modules.append(module)
+        if not modules:
+            return []
+    scenes = index.get_scenes(modules, bases=bases)
+    if patterns:
+        scenes = [
+            s for s in scenes
+            if any(fnmatch.fnmatchcase(s["name"], p) for p in patterns)
+        ]
+    return scenes
+
+
+def get_command(scene, manim_args=(), profile="final"):
+    '''
+    The command rendering one scene with whichever manim its module uses,
+    with the render profile profile.
+    '''
+    path = scene["path"]
+    if scene["api"] == "gl":
+        command = [sys.executable, "scene_runner.py", path, scene["name"], "-w", "--batch"]
+        if profile != "final":
+            command += ["--profile", profile]
+    elif scene["api"] == "community":
+        command = ["manim", "render", path, scene["name"]] + PROFILES[profile]["community_args"]
     else:
-        s = head[head.index("("):head.index(")") + 1]
-        li.append(head.replace(s, ""))
+        command = [sys.executable, "manim.py", path, scene["name"], "-w"] + PROFILES[profile]["cairo_args"]
+    return command + list(manim_args)
+
+
+def get_fps(profile="final", manim_args=()):
+    '''
+    Frames per second scenes render at with profile and manim_args, the
+    last of them to set it winning, or FPS if none does.
+    '''
+    fps = PROFILES[profile]["fps"] or FPS
+    args = list(manim_args)
+    for i, arg in enumerate(args):
+        name, _, value = arg.partition("=")
+        if name in ("--fps", "--frame_rate") and (value or i + 1 < len(args)):
+            try:
+                fps = float(value or args[i + 1])
+            except ValueError:
+                pass
+        elif arg in QUALITY_FPS:
+            fps = QUALITY_FPS[arg]
+    return fps
+
+
+def get_render_name(scene, profile="final"):
+    '''
+    The name of a scene in the render cache and the logs, which only
+    says the profile if it isn't final.
+    '''
+    name = f"{scene['module']}.{scene['name']}"
+    return name if profile == "final" else f"{name}@{profile}"
+
+
+def load_render_cache(path=RENDER_CACHE):
+    '''
+    The key each scene had when it was last rendered successfully, with
+    the file it was rendered to, or when its draft was approved for
+    APPROVALS.
+    '''
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_render_cache(cache, path=RENDER_CACHE):
+    temp = path + ".tmp"
+    with open(temp, "w") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(temp, path)
+
+
+def find_output(scene, since):
+    '''
+    The file a render of scene that started at since wrote, relative to
+    ROOT, or None if there is none under ROOT. The three manims put it in
+    different places, so it is looked up by name, preferring one in a
+    directory named after its module, where the cairo manims put it.
+    '''
+    names = {scene["name"] + ext for ext in OUTPUT_EXTENSIONS}
+    module = scene["module"].split(".")[-1]
+    found = []
+    for directory, dirs, files in os.walk(ROOT):
+        dirs[:] = [
+            d for d in dirs
+            if not d.startswith(".") and d != "__pycache__"
+            and not os.path.exists(os.path.join(directory, d, "pyvenv.cfg"))
+        ]
+        for f in names.intersection(files):
+            path = os.path.relpath(os.path.join(directory, f), ROOT)
+            mtime = os.path.getmtime(os.path.join(ROOT, path))
+            if mtime >= since:
+                found.append((module in path.split(os.sep), mtime, path))
+    return max(found)[2] if found else None
+
+
+def is_up_to_date(cache, scene, profile="final"):
+    '''
+    Whether scene was rendered with its current key and, if its output
+    was found then, that output is still there.
+    '''
+    entry = cache.get(get_render_name(scene, profile))
+    if not isinstance(entry, dict) or entry["key"] != scene["key"]:
+        return False
+    return entry["output"] is None or os.path.exists(os.path.join(ROOT, entry["output"]))
+
+
+def add_keys(index, scenes, manim_args=(), profile="final"):
+    '''
+    The scenes with the key of everything their output depends on in
+    scene["key"], see SceneIndex.get_scene_key.
+    '''
+    extra = [repr(PROFILES[profile])] if profile != "final" else []
+    return [
+        dict(scene, key=index.get_scene_key(
+            scene["module"], scene["name"],
+            get_command(scene, manim_args, profile)[1:] + extra))
+        for scene in scenes
+    ]
+
+
+def approve(index, scenes, manim_args=()):
+    '''
+    Records the drafts of scenes as approved, if they are up to date, so
+    render_all.py -r -p final --approved renders them.
+    '''
+    cache = load_render_cache()
+    approvals = load_render_cache(APPROVALS)
+    for scene in add_keys(index, scenes, manim_args, "draft"):
+        name = get_render_name(scene)
+        if not is_up_to_date(cache, scene, "draft"):
+            print(f"{name}: the draft is out of date or wasn't rendered, not approved")
+            continue
+        approvals[name] = scene["key"]
+        print(f"{name}: approved")
+    save_render_cache(approvals, APPROVALS)
+
+
+def get_approved(index, scenes, manim_args=()):
+    '''
+    The scenes whose approved draft is still what they would render.
+    '''
+    approvals = load_render_cache(APPROVALS)
+    keys = add_keys(index, scenes, manim_args, "draft")
+    return [
+        scene for scene, draft in zip(scenes, keys)
+        if approvals.get(get_render_name(scene)) == draft["key"]
+    ]
+
+
+def render_scene(scene, manim_args=(), timeout=None, retries=1, profile="final", profiling=False,
+                 mobject_budgets=None):
+    '''
+    Renders scene in its own process, trying again up to retries times if
+    it crashes or times out. Output goes to LOG_DIR/<module>.<scene>.log.
+    '''
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_file = os.path.join(LOG_DIR, f"{get_render_name(scene, profile)}.log")
+    command = get_command(scene, manim_args, profile)
+    # For manim.py, scene_runner.py gets it in command
+    env = dict(os.environ, RENDER_PROFILE=profile)
+    if profiling:
+        env["SCENE_PROFILING"] = "1"
+    if mobject_budgets is not None:
+        env["MOBJECT_STATS"] = "1"
+        env["MOBJECT_BUDGETS"] = mobject_budgets
+
+    start = time.time()
+    for attempt in range(1, retries + 2):
+        with open(log_file, "w") as log:
+            process = subprocess.Popen(
+                command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+            try:
+                code = process.wait(timeout=timeout)
+                status = f"failed ({code})"
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                code, status = None, "timeout"
+        if code == 0:
+            return dict(scene, status="ok", attempts=attempt, output=find_output(scene, start),
+                        wall_time=time.time() - start, log=log_file)
+    return dict(scene, status=status, attempts=attempt,
+                wall_time=time.time() - start, log=log_file)
+
+
+def schedule(scenes, workers):
+    '''
+    Orders scenes longest first by their estimated duration and packs
+    them greedily onto workers, the way the pool will pick them up.
+    Returns the ordered scenes and the estimated seconds per worker.
+    '''
+    scenes = sorted(scenes, key=lambda s: s["duration"], reverse=True)
+    loads = [0] * workers
+    for scene in scenes:
+        loads[loads.index(min(loads))] += scene["duration"]
+    return scenes, loads
+
+
+def render_scenes(scenes, workers=None, manim_args=(), timeout=None, retries=1, cache=None,
+                  profile="final", profiling=False, mobject_budgets=None):
+    '''
+    Renders scenes on a pool of workers processes, longest first,
+    printing each one as it finishes, and returns the results in the
+    order they were started. The key of every scene rendered is stored
+    in cache, if given, as soon as it finishes.
+    '''
+    workers = workers or os.cpu_count()
+    fps = get_fps(profile, manim_args)
+    scenes, loads = schedule(scenes, workers)
+    print(
+        f"Rendering {len(scenes)} scenes on {workers} workers, "
+        f"{sum(loads) * fps:.0f} frames estimated, "
+        f"{max(loads, default=0) * fps:.0f} on the busiest worker",
+        flush=True,
+    )
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_scene, scene, manim_args, timeout, retries, profile, profiling,
+                        mobject_budgets): i
+            for i, scene in enumerate(scenes)
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if cache is not None and result["status"] == "ok" and "key" in result:
+                cache[get_render_name(result, profile)] = dict(
+                    key=result["key"], output=result["output"])
+                save_render_cache(cache)
+            print(
+                f"[{len(results)}/{len(scenes)}] {result['module']}.{result['name']}:",
+                f"{result['status']} in {result['wall_time']:.1f}s",
+                flush=True,
+            )
+    results = [results[i] for i in range(len(scenes))]
+    log_estimates(results, fps)
+    return results
+
+
+def log_estimates(results, fps=FPS):
+    '''
+    Appends the estimated frames and the actual time of every scene to
+    ESTIMATES_LOG, to check the duration estimates against.
+    '''
+    new = not os.path.exists(ESTIMATES_LOG)
+    with open(ESTIMATES_LOG, "a") as f:
+        if new:
+            f.write("time,module,scene,status,estimated_frames,wall_time\n")
+        for r in results:
+            f.write(f"{time.time():.0f},{r['module']},{r['name']},{r['status']},"
+                    f"{r['duration'] * fps:.0f},{r['wall_time']:.2f}\n")
+
+
+def print_summary(results, wall_time, fps=FPS):
+    width = max([len(f"{r['module']}.{r['name']}") for r in results] + [5])
+    print()
+    print(f"{'Scene':<{width}}  {'Status':<12}  {'Tries':>5}  {'Est. frames':>11}  {'Time':>8}  {'ms/frame':>8}")
+    for r in results:
+        name = f"{r['module']}.{r['name']}"
+        frames = r["duration"] * fps
+        per_frame = f"{1000 * r['wall_time'] / frames:.1f}" if frames else "-"
+        print(f"{name:<{width}}  {r['status']:<12}  {r['attempts']:>5}  {frames:>11.0f}  "
+              f"{r['wall_time']:>7.1f}s  {per_frame:>8}")
+
+    serial = sum(r["wall_time"] for r in results)
+    failed = [r for r in results if r["status"] != "ok"]
+    print()
+    print(f"{len(results) - len(failed)}/{len(results)} scenes rendered in {wall_time:.1f}s "
+          f"({serial:.1f}s of scene time, {serial / max(wall_time, 1e-9):.1f}x)")
+    for r in failed:
+        print(f"  {r['module']}.{r['name']} {r['status']}, see {r['log']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List or render the scenes in a module, or in the whole repo")
+    parser.add_argument("files", nargs="*", help="modules to look in, all of them if none are given")
+    parser.add_argument("-b", "--base", nargs="+", help="only scenes deriving from these classes, e.g. PartScene TitleScene")
+    parser.add_argument("-s", "--select", nargs="+", help="only scenes matching these glob patterns")
+    parser.add_argument("-l", "--long", action="store_true", help="also print module, bases and CONFIG keys")
+    parser.add_argument("-r", "--render", action="store_true", help="render the scenes instead of listing them")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of scenes rendered at once, one per core by default")
+    parser.add_argument("-t", "--timeout", type=float, default=None, help="seconds before a scene is killed")
+    parser.add_argument("--retries", type=int, default=1, help="times a scene that crashed or timed out is tried again")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="render scenes even if nothing they depend on changed and their output is still there")
+    parser.add_argument("--prewarm-tex", action="store_true", help="compile the literal TeX of the scenes first, see tex_cache.py")
+    parser.add_argument("-p", "--profile", choices=sorted(PROFILES), default="final",
+                        help="render profile, see render_profiles.py")
+    parser.add_argument("--profiling", action="store_true",
+                        help="report where the render time of each scene goes, see scene_profiler.py")
+    parser.add_argument("--mobject-stats", nargs="?", const="", default=None, metavar="NAME=N,...",
+                        help="warn about plays over the mobject budgets, optionally changed, see mobject_stats.py")
+    parser.add_argument("--approve", action="store_true", help="approve the up to date drafts of the scenes")
+    parser.add_argument("--approved", action="store_true", help="only scenes whose approved draft is up to date")
+    parser.add_argument("--manim-args", default="", help="extra arguments passed to manim, e.g. \"-l\"")
+    args = parser.parse_args()
+
+    index = get_index(ROOT)
+    scenes = select_scenes(index, args.files, args.base, args.select)
+    manim_args = shlex.split(args.manim_args)
+    if args.approved:
+        scenes = get_approved(index, scenes, manim_args)
+
+    if args.approve:
+        approve(index, scenes, manim_args)
+        sys.exit()
+
+    if not args.render:
+        for scene in scenes:
+            if args.long:
+                print(
+                    f"{scene['module']}.{scene['name']}",
+                    f"({', '.join(scene['bases'])})",
+                    f"~{scene['duration'] * get_fps(args.profile, manim_args):.0f} frames",
+                    " ".join(scene["config_keys"]),
+                )
+            else:
+                print(scene["name"])
+        sys.exit()
+
+    cache = load_render_cache()
+    scenes = add_keys(index, scenes, manim_args, args.profile)
+    if not args.force:
+        stale = [s for s in scenes if not is_up_to_date(cache, s, args.profile)]
+        print(f"{len(scenes) - len(stale)} of {len(scenes)} scenes are up to date")
+        scenes = stale
+        if not scenes:
+            sys.exit()
+
+    if args.prewarm_tex:
+        from tex_cache import prewarm, print_report
+
+        start = time.time()
+        gl_scenes = [s for s in scenes if s["api"] == "gl"]
+        print_report(prewarm(index, gl_scenes, args.workers), time.time() - start)
+        print()
 
-for i in li:
-    print(i)
+    start = time.time()
+    results = render_scenes(
+        scenes,
+        workers=args.workers,
+        manim_args=manim_args,
+        timeout=args.timeout,
+        retries=args.retries,
+        cache=cache,
+        profile=args.profile,
+        profiling=args.profiling,
+        mobject_budgets=args.mobject_stats,
+    )
+    print_summary(results, time.time() - start, get_fps(args.profile, manim_args))
+    if args.profiling and os.path.isdir(os.path.join(ROOT, PROFILE_DIR)):
+        print()
+        print_aggregate(aggregate(os.path.join(ROOT, PROFILE_DIR)))
+    sys.exit(any(r["status"] != "ok" for r in results))
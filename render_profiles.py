@@ -0,0 +1,115 @@
+'''
+Named render profiles. Each one sets the resolution and frame rate, and
+adjusts the CONFIG values that make scenes slow to render, for every
+scene without touching it. draft is for iterating, review for checking
+a scene in motion and final is what custom_config.yml asks for.
+
+render_all.py -p draft renders with one, and --approve and --approved
+re-render approved drafts as final.
+'''
+
+PROFILES = {
+    "draft": {
+        "resolution": (854, 480),
+        "fps": 15,
+        # Flags giving the same quality to the other manims
+        "cairo_args": ["-l"],
+        "community_args": ["-ql"],
+        # Fraction of the points ParametricSurfaces sample on each side
+        "surface_resolution": 0.25,
+        # Fraction of the arrows vector fields have on each side
+        "field_density": 0.5,
+        "mandelbrot_max_steps": 30,
+    },
+    "review": {
+        "resolution": (1280, 720),
+        "fps": 30,
+        "cairo_args": ["-m"],
+        "community_args": ["-qm"],
+        "surface_resolution": 0.5,
+        "field_density": 1,
+        "mandelbrot_max_steps": 100,
+    },
+    "final": {
+        "resolution": None,
+        "fps": None,
+        "cairo_args": [],
+        "community_args": [],
+        "surface_resolution": 1,
+        "field_density": 1,
+        "mandelbrot_max_steps": None,
+    },
+}
+
+
+def scale_resolution(resolution, factor):
+    if isinstance(resolution, (tuple, list)):
+        return type(resolution)(scale_resolution(r, factor) for r in resolution)
+    return max(2, int(round(resolution * factor)))
+
+
+def get_rules(profile):
+    '''
+    (class name, attribute, function) for every CONFIG value profile
+    changes, the function taking the value scenes ask for. Classes match
+    by name so those of either manim, and of the repo, are covered.
+    '''
+    p = PROFILES[profile]
+    rules = []
+    if p["surface_resolution"] != 1:
+        for name in ("Surface", "ParametricSurface"):
+            rules.append((name, "resolution", lambda r: scale_resolution(r, p["surface_resolution"])))
+    if p["field_density"] != 1:
+        spacing = 1 / p["field_density"]
+        rules.append(("BatchedVectorField", "step", lambda s: s * spacing))
+        rules.append(("VectorField", "step_multiple", lambda s: s * spacing))
+        rules.append(("VectorField", "delta_x", lambda d: d * spacing))
+        rules.append(("VectorField", "delta_y", lambda d: d * spacing))
+    if p["mandelbrot_max_steps"] is not None:
+        rules.append(("MandelbrotSet", "num_steps", lambda n: min(n, p["mandelbrot_max_steps"])))
+    return rules
+
+
+def apply_rules(obj, rules):
+    names = {cls.__name__ for cls in type(obj).__mro__}
+    # digest_config can run more than once on the same object, and the
+    # cairo one keeps values already set
+    applied = obj.__dict__.setdefault("profile_values", {})
+    for name, attr, func in rules:
+        if name not in names or attr not in obj.__dict__:
+            continue
+        if attr in applied and applied[attr] == obj.__dict__[attr]:
+            continue
+        applied[attr] = func(obj.__dict__[attr])
+        setattr(obj, attr, applied[attr])
+
+
+def install_profile(profile):
+    '''
+    Applies the CONFIG changes of profile to every object manimlib's
+    digest_config sets up from now on.
+    '''
+    import sys
+
+    import manimlib.utils.config_ops as config_ops
+    try:
+        # Not used here: imported so that every module binding
+        # digest_config by name has done so before it is patched below
+        import manimlib.imports
+    except ImportError:
+        # manimgl has no manimlib.imports
+        pass
+
+    rules = get_rules(profile)
+    if not rules:
+        return
+    digest_config = config_ops.digest_config
+
+    def profiled_digest_config(obj, kwargs, *args, **kw):
+        digest_config(obj, kwargs, *args, **kw)
+        apply_rules(obj, rules)
+
+    # It's imported by name all over manimlib
+    for module in list(sys.modules.values()):
+        if getattr(module, "__dict__", {}).get("digest_config") is digest_config:
+            module.digest_config = profiled_digest_config
@@ -0,0 +1,626 @@
+import ast
+import glob
+import hashlib
+import json
+import math
+import os
+
+INDEX_FILE = ".scene_index.json"
+INDEX_VERSION = 7
+
+_file_hashes = {}
+
+# Scene classes that come from manim itself rather than this repo
+SCENE_BASES = {
+    "Scene", "ThreeDScene", "SpecialThreeDScene", "GraphScene",
+    "MovingCameraScene", "ZoomedScene", "VectorScene",
+    "LinearTransformationScene", "InteractiveScene",
+    "ReconfigurableScene", "SampleSpaceScene",
+}
+
+# Directories of files scenes load, which go into their render keys
+ASSET_DIRS = ("img", "shaders")
+# and of data files they load from anywhere else, like zeros.txt
+DATA_EXTENSIONS = (".txt", ".csv", ".json", ".npy", ".npz")
+CONFIG_FILE = "custom_config.yml"
+
+# Directories under root that hold no scenes: environments, build
+# output, installed or vendored packages and rendered media
+SKIP_DIRS = {
+    "__pycache__", "venv", "env", "build", "dist", "site-packages",
+    "node_modules", "manimlib", "media", "videos",
+}
+
+# Mobjects compiled with LaTeX, and the keyword arguments that change
+# what gets compiled
+TEX_CLASSES = ("Tex", "TexText", "TexMobject", "TextMobject")
+TEX_KWARGS = ("isolate", "tex_to_color_map", "arg_separator", "alignment", "math_mode")
+
+DEFAULT_RUN_TIME = 1
+DEFAULT_WAIT_TIME = 1
+
+
+def hash_source(source):
+    return hashlib.sha1(source.encode() if isinstance(source, str) else source).hexdigest()
+
+
+def get_config_keys(node):
+    '''
+    Keys of a CONFIG = {...} dict literal in the body of a class.
+    '''
+    for stmt in node.body:
+        if (isinstance(stmt, ast.Assign)
+                and any(isinstance(t, ast.Name) and t.id == "CONFIG" for t in stmt.targets)
+                and isinstance(stmt.value, ast.Dict)):
+            return [k.value for k in stmt.value.keys
+                    if isinstance(k, ast.Constant) and isinstance(k.value, str)]
+    return []
+
+
+def eval_number(node):
+    '''
+    The value of a numeric expression made only of constants, like 2,
+    -0.5 or 1 / 3, otherwise None.
+    '''
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = eval_number(node.operand)
+        if value is not None:
+            return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.BinOp):
+        left, right = eval_number(node.left), eval_number(node.right)
+        if left is not None and right is not None:
+            try:
+                return {
+                    ast.Add: lambda: left + right,
+                    ast.Sub: lambda: left - right,
+                    ast.Mult: lambda: left * right,
+                    ast.Div: lambda: left / right,
+                    ast.FloorDiv: lambda: left // right,
+                }[type(node.op)]()
+            except (KeyError, ZeroDivisionError):
+                return None
+    return None
+
+
+def count_iterations(node):
+    '''
+    How many times a for loop over node runs, when that can be told from
+    the source, otherwise 1.
+    '''
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return len(node.elts)
+    if isinstance(node, ast.Subscript):
+        return count_iterations(node.value)
+    if not isinstance(node, ast.Call):
+        return 1
+    func = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", None)
+    if func in ("enumerate", "reversed", "list", "tuple") and node.args:
+        return count_iterations(node.args[0])
+    if func == "zip" and node.args:
+        return min(count_iterations(a) for a in node.args)
+    args = [eval_number(a) for a in node.args]
+    if None in args or not args:
+        return 1
+    if func == "range":
+        return len(range(*[int(a) for a in args]))
+    if func == "arange":
+        if len(args) == 1:
+            args = [0] + args
+        start, stop, step = (args + [1])[:3]
+        return max(0, math.ceil((stop - start) / step))
+    if func == "linspace" and len(args) >= 3:
+        return int(args[2])
+    return 1
+
+
+def get_play_time(call):
+    '''
+    Seconds taken by a self.play call, its run_time or the longest
+    run_time of the animations passed to it.
+    '''
+    for keyword in call.keywords:
+        if keyword.arg == "run_time":
+            value = eval_number(keyword.value)
+            return DEFAULT_RUN_TIME if value is None else value
+    times = [
+        eval_number(k.value)
+        for arg in call.args for node in ast.walk(arg) if isinstance(node, ast.Call)
+        for k in node.keywords if k.arg == "run_time"
+    ]
+    times = [t for t in times if t is not None]
+    return max(times) if times else DEFAULT_RUN_TIME
+
+
+def get_wait_time(call):
+    for keyword in call.keywords:
+        if keyword.arg == "duration":
+            call = keyword.value
+            break
+    else:
+        call = call.args[0] if call.args else None
+    value = None if call is None else eval_number(call)
+    return DEFAULT_WAIT_TIME if value is None else value
+
+
+def estimate_statements(statements):
+    '''
+    Seconds of animation in a list of statements, counting self.play and
+    self.wait calls and multiplying through for loops, together with how
+    many times each other self.method is called. Of the branches of an
+    if, the longest one is counted.
+    '''
+    time = 0
+    calls = {}
+
+    def add(other_time, other_calls, times=1):
+        nonlocal time
+        time += other_time * times
+        for name, count in other_calls.items():
+            calls[name] = calls.get(name, 0) + count * times
+
+    for stmt in statements:
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        if isinstance(stmt, (ast.For, ast.AsyncFor)):
+            add(*estimate_statements(stmt.body), count_iterations(stmt.iter))
+            add(*estimate_statements(stmt.orelse))
+            continue
+        if isinstance(stmt, ast.If):
+            add(*max(estimate_statements(stmt.body), estimate_statements(stmt.orelse),
+                     key=lambda e: e[0]))
+            continue
+        if isinstance(stmt, (ast.While, ast.With, ast.AsyncWith, ast.Try)):
+            add(*estimate_statements(stmt.body))
+            for handler in getattr(stmt, "handlers", []):
+                add(*estimate_statements(handler.body))
+            add(*estimate_statements(getattr(stmt, "orelse", [])))
+            add(*estimate_statements(getattr(stmt, "finalbody", [])))
+            continue
+
+        for node in ast.walk(stmt):
+            if not (isinstance(node, ast.Call)
+                    and isinstance(node.func, ast.Attribute)
+                    and isinstance(node.func.value, ast.Name)
+                    and node.func.value.id == "self"):
+                continue
+            if node.func.attr == "play":
+                time += get_play_time(node)
+            elif node.func.attr == "wait":
+                time += get_wait_time(node)
+            else:
+                calls[node.func.attr] = calls.get(node.func.attr, 0) + 1
+    return time, calls
+
+
+def get_asset_patterns(node):
+    '''
+    Glob patterns of the files in ASSET_DIRS and the data files that
+    strings in node refer to, with the formatted parts of f-strings as
+    wildcards.
+    '''
+    patterns = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Constant) and isinstance(child.value, str):
+            pattern = child.value
+        elif isinstance(child, ast.JoinedStr):
+            pattern = "".join(
+                v.value if isinstance(v, ast.Constant) else "*" for v in child.values)
+        else:
+            continue
+        pattern = os.path.normpath(pattern) if pattern else pattern
+        if pattern.split(os.sep)[0] in ASSET_DIRS:
+            patterns.add(pattern)
+        elif (os.path.splitext(pattern)[1] in DATA_EXTENSIONS
+              and not os.path.isabs(pattern) and not pattern.startswith("..")):
+            patterns.add(pattern)
+    return sorted(patterns)
+
+
+def get_literal(node, literals):
+    '''
+    The value of a literal, looking up names in literals, or raises
+    ValueError. Only the keys of dicts are kept.
+    '''
+    if isinstance(node, ast.Name) and node.id in literals:
+        return get_literal(literals[node.id], {})
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [get_literal(e, literals) for e in node.elts]
+    if isinstance(node, ast.Dict):
+        return {get_literal(k, literals): None for k in node.keys if k is not None}
+    if isinstance(node, ast.Constant):
+        return node.value
+    raise ValueError
+
+
+def get_tex_calls(node):
+    '''
+    The calls to TEX_CLASSES in node whose strings and TEX_KWARGS are all
+    literals, or names assigned a literal just once in the same function,
+    as dicts of the class name, the strings and those keyword arguments.
+    '''
+    calls = []
+    seen = set()
+    functions = [n for n in ast.walk(node) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    for func in functions or [node]:
+        assigned = {}
+        for n in ast.walk(func):
+            if isinstance(n, ast.Assign) and len(n.targets) == 1 and isinstance(n.targets[0], ast.Name):
+                name = n.targets[0].id
+                assigned[name] = None if name in assigned else n.value
+        literals = {k: v for k, v in assigned.items() if v is not None}
+
+        for call in ast.walk(func):
+            if (id(call) in seen or not isinstance(call, ast.Call)
+                    or not isinstance(call.func, ast.Name) or call.func.id not in TEX_CLASSES):
+                continue
+            seen.add(id(call))
+            try:
+                strings = [get_literal(a, literals) for a in call.args]
+                kwargs = {}
+                for keyword in call.keywords:
+                    if keyword.arg is None:
+                        raise ValueError
+                    if keyword.arg in TEX_KWARGS:
+                        value = get_literal(keyword.value, literals)
+                        kwargs[keyword.arg] = list(value) if isinstance(value, dict) else value
+            except ValueError:
+                continue
+            if strings and all(isinstance(s, str) for s in strings):
+                calls.append({"class": call.func.id, "strings": strings, "kwargs": kwargs})
+    return calls
+
+
+def get_definitions(tree, lines):
+    '''
+    Every top level function, class and assigned name of a module with a
+    hash of its source, the names it uses and the assets it refers to.
+    '''
+    definitions = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names = [node.name]
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names = [n.id for t in targets for n in ast.walk(t) if isinstance(n, ast.Name)]
+        else:
+            continue
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        source_hash = hash_source("".join(lines[start - 1:node.end_lineno]))
+        used = sorted({n.id for n in ast.walk(node) if isinstance(n, ast.Name)})
+        for name in names:
+            previous = definitions.get(name)
+            # Names assigned more than once depend on every assignment
+            definitions[name] = {
+                "hash": source_hash if previous is None else hash_source(previous["hash"] + source_hash),
+                "names": sorted(set(used) | set(previous["names"] if previous else [])),
+                "assets": sorted(set(get_asset_patterns(node)) | set(previous["assets"] if previous else [])),
+                "tex": get_tex_calls(node) + (previous["tex"] if previous else []),
+            }
+    return definitions
+
+
+def get_api(tree):
+    '''
+    Which manim a module is written for: "cairo" for 3b1b's old
+    manimlib.imports, "gl" for manimgl and "community" for manim.
+    '''
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and not node.level:
+            if node.module == "manimlib.imports":
+                return "cairo"
+            if node.module == "manimlib":
+                return "gl"
+            if node.module == "manim":
+                return "community"
+    return None
+
+
+def parse_module(source):
+    '''
+    Every top level class of a module with its bases, CONFIG keys, line
+    range and a hash of its source, plus the names the module imports
+    from other modules.
+    '''
+    tree = ast.parse(source)
+    lines = source.splitlines(keepends=True)
+    classes = {}
+    imports = {}
+    star_imports = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            classes[node.name] = {
+                "bases": [ast.unparse(b) for b in node.bases],
+                "config_keys": get_config_keys(node),
+                "lineno": start,
+                "end_lineno": node.end_lineno,
+                "hash": hash_source("".join(lines[start - 1:node.end_lineno])),
+                "methods": {
+                    stmt.name: estimate_statements(stmt.body)
+                    for stmt in node.body if isinstance(stmt, ast.FunctionDef)
+                },
+            }
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            for alias in node.names:
+                if alias.name == "*":
+                    star_imports.append(node.module)
+                else:
+                    imports[alias.asname or alias.name] = node.module
+    return {
+        "classes": classes,
+        "imports": imports,
+        "star_imports": star_imports,
+        "api": get_api(tree),
+        "definitions": get_definitions(tree, lines),
+    }
+
+
+class SceneIndex(object):
+    '''
+    An index of the classes in every module of the repo, built with ast so
+    nothing gets imported. It is kept in INDEX_FILE and each module is only
+    parsed again when its mtime and then its hash change.
+    '''
+    def __init__(self, root=".", index_file=INDEX_FILE):
+        self.root = root
+        self.index_file = os.path.join(root, index_file)
+        self.modules = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.modules = data["modules"]
+
+    def save(self):
+        temp = self.index_file + ".tmp"
+        with open(temp, "w") as f:
+            json.dump({"version": INDEX_VERSION, "modules": self.modules}, f)
+        os.replace(temp, self.index_file)
+
+    def get_module_names(self):
+        '''
+        Dotted names of every module under root, like alg1.lineq.chapter1,
+        leaving out hidden directories, virtual environments and SKIP_DIRS.
+        '''
+        names = []
+        for directory, dirs, files in os.walk(self.root):
+            dirs[:] = sorted(
+                d for d in dirs
+                if not d.startswith(".") and d not in SKIP_DIRS
+                and not os.path.exists(os.path.join(directory, d, "pyvenv.cfg"))
+            )
+            for f in files:
+                if f.endswith(".py"):
+                    path = os.path.relpath(os.path.join(directory, f[:-3]), self.root)
+                    names.append(path.replace(os.sep, "."))
+        return sorted(names)
+
+    def get_module_name(self, path):
+        '''
+        The dotted name of the module at path, relative to the working
+        directory, or None if it isn't in the index.
+        '''
+        path = os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+        name = os.path.splitext(path)[0].replace(os.sep, ".")
+        return name if name in self.modules else None
+
+    def update(self):
+        changed = False
+        names = self.get_module_names()
+        for name in set(self.modules) - set(names):
+            del self.modules[name]
+            changed = True
+
+        for name in names:
+            path = get_module_path(name, self.root)
+            mtime = os.stat(path).st_mtime_ns
+            entry = self.modules.get(name)
+            if entry is not None and entry["mtime"] == mtime:
+                continue
+
+            with open(path, "rb") as f:
+                source = f.read()
+            digest = hash_source(source)
+            changed = True
+            if entry is not None and entry["hash"] == digest:
+                entry["mtime"] = mtime
+                continue
+            try:
+                entry = parse_module(source.decode())
+            except (SyntaxError, UnicodeDecodeError) as e:
+                print(f"Skipping {get_module_path(name)}: {e}")
+                entry = {"classes": {}, "imports": {}, "star_imports": [], "api": None,
+                         "definitions": {}}
+            entry.update(mtime=mtime, hash=digest)
+            self.modules[name] = entry
+
+        if changed:
+            self.save()
+        return self
+
+    def find_class(self, module, name):
+        '''
+        The (module, name) a class name refers to inside module, or None
+        if it isn't defined anywhere in the repo.
+        '''
+        return self.find_definition(module, name, "classes")
+
+    def find_definition(self, module, name, table="definitions", seen=()):
+        entry = self.modules.get(module)
+        if entry is None or (module, name) in seen:
+            return None
+        seen = seen + ((module, name),)
+        if name in entry[table]:
+            return (module, name)
+        if name in entry["imports"]:
+            return self.find_definition(entry["imports"][name], name, table, seen)
+        for other in entry["star_imports"]:
+            found = self.find_definition(other, name, table, seen)
+            if found is not None:
+                return found
+        return None
+
+    def get_base_chain(self, module, name):
+        '''
+        Every base class of module.name, followed through the repo, with
+        the manim classes they end at given as (None, name).
+        '''
+        chain = []
+        stack = [(module, name)]
+        seen = set()
+        while stack:
+            module, name = stack.pop()
+            if (module, name) in seen:
+                continue
+            seen.add((module, name))
+            for base in self.modules[module]["classes"][name]["bases"]:
+                base = base.split(".")[-1]
+                # class Scene(Scene) refers to the imported Scene
+                found = None if base == name else self.find_class(module, base)
+                if found is None:
+                    chain.append((None, base))
+                else:
+                    chain.append(found)
+                    stack.append(found)
+        return chain
+
+    def is_scene(self, module, name):
+        return any(
+            m is None and base in SCENE_BASES
+            for m, base in self.get_base_chain(module, name)
+        )
+
+    def find_method(self, module, name, method):
+        '''
+        The (time, calls) estimate of the method a class uses, looked up
+        on the class and then its bases in the repo.
+        '''
+        classes = [(module, name)] + [c for c in self.get_base_chain(module, name) if c[0]]
+        for m, n in classes:
+            methods = self.modules[m]["classes"][n]["methods"]
+            if method in methods:
+                return (m, n), methods[method]
+        return None, None
+
+    def estimate_duration(self, module, name, method="construct", stack=()):
+        '''
+        Seconds of animation a scene plays, from the run_time of its play
+        calls and its waits, following calls to its own methods.
+        '''
+        owner, estimate = self.find_method(module, name, method)
+        if estimate is None or (owner, method) in stack:
+            return 0
+        time, calls = estimate
+        stack = stack + ((owner, method),)
+        for callee, count in calls.items():
+            time += count * self.estimate_duration(module, name, callee, stack)
+        return time
+
+    def get_scenes(self, modules=None, bases=None):
+        '''
+        Dicts describing every Scene subclass in modules (all of them by
+        default), optionally only the ones deriving from one of bases.
+        '''
+        scenes = []
+        for module in modules or sorted(self.modules):
+            for name, info in self.modules[module]["classes"].items():
+                if not self.is_scene(module, name):
+                    continue
+                if bases and not set(bases) & {
+                        b for m, b in self.get_base_chain(module, name)}:
+                    continue
+                scenes.append(dict(
+                    info, module=module, name=name, path=get_module_path(module),
+                    api=self.modules[module]["api"],
+                    duration=self.estimate_duration(module, name)))
+        return scenes
+
+
+    def get_dependencies(self, module, name):
+        '''
+        Every definition in the repo that module.name uses, directly or
+        through other definitions, as (module, name) pairs, itself included.
+        '''
+        found = {(module, name)}
+        stack = [(module, name)]
+        while stack:
+            module, name = stack.pop()
+            for used in self.modules[module]["definitions"][name]["names"]:
+                # class Scene(Scene) uses the imported Scene, not itself
+                if used == name:
+                    continue
+                other = self.find_definition(module, used)
+                if other is not None and other not in found:
+                    found.add(other)
+                    stack.append(other)
+        return sorted(found)
+
+    def get_tex_calls(self, module, name):
+        '''
+        The literal TeX a scene compiles, in itself and in everything from
+        the repo it uses, see get_tex_calls.
+        '''
+        return [
+            call
+            for m, n in self.get_dependencies(module, name)
+            for call in self.modules[m]["definitions"][n]["tex"]
+        ]
+
+    def get_asset_files(self, pattern):
+        paths = []
+        for path in glob.glob(os.path.join(self.root, pattern)):
+            if os.path.isdir(path):
+                paths.extend(
+                    os.path.join(d, f) for d, _, files in os.walk(path) for f in files)
+            else:
+                paths.append(path)
+        return sorted(paths)
+
+    def get_scene_key(self, module, name, extra=()):
+        '''
+        A hash of everything the output of a scene depends on: the source
+        of the scene class, of its bases, and so of its resolved CONFIG,
+        of the functions, classes and constants from the repo it uses, the
+        img/ and shaders/ files and data files they refer to,
+        custom_config.yml and extra, like the arguments given to manim.
+        '''
+        key = hashlib.sha1()
+        assets = set()
+        for m, n in self.get_dependencies(module, name):
+            definition = self.modules[m]["definitions"][n]
+            key.update(f"{m}.{n}:{definition['hash']}\n".encode())
+            assets.update(definition["assets"])
+
+        for path in sorted({p for a in assets for p in self.get_asset_files(a)}):
+            key.update(os.path.relpath(path, self.root).encode())
+            key.update(self.hash_file(path).encode())
+
+        config_file = os.path.join(self.root, CONFIG_FILE)
+        if os.path.exists(config_file):
+            key.update(self.hash_file(config_file).encode())
+        for item in extra:
+            key.update(f"{item}\n".encode())
+        return key.hexdigest()
+
+    def hash_file(self, path):
+        stat = os.stat(path)
+        cache_key = (path, stat.st_mtime_ns, stat.st_size)
+        if cache_key not in _file_hashes:
+            with open(path, "rb") as f:
+                _file_hashes[cache_key] = hash_source(f.read())
+        return _file_hashes[cache_key]
+
+
+def get_module_path(name, root=""):
+    return os.path.join(root, *name.split(".")) + ".py"
+
+
+def get_index(root="."):
+    return SceneIndex(root).update()
@@ -0,0 +1,371 @@
+'''
+Where the render time of a scene goes: each self.play and self.wait,
+each updater, and the stages of its frames (updating, rasterizing and
+writing them), along with become, Tex and svgs. Works with either manim.
+Every scene rendered writes PROFILE_DIR/<module>.<Scene>.json, and a
+.folded file of stacks for flamegraph.pl or speedscope.
+
+Times include what is nested in them, self_time doesn't. blocks is how
+many more memory blocks Python holds afterwards. With PYTHONTRACEMALLOC=1,
+peak_kb also says how far memory rose while it ran, at the cost of
+slowing everything down.
+
+Running this module sums up every report in PROFILE_DIR:
+
+    python scene_profiler.py
+'''
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from functools import wraps
+
+PROFILE_DIR = os.path.join("render_logs", "profiles")
+# They wrap manimlib, so their frames are skipped looking for the scene
+RUNNER_FILES = {"scene_runner.py", "scene_profiler.py", "mobject_stats.py"}
+
+# Methods timed as a stage wherever the manim in use has them
+SCENE_STAGES = {
+    "update_frame": "update_frame",
+    "update_mobjects": "update",
+    "continual_update": "update",
+}
+CLASS_STAGES = [
+    ("manimlib.camera.camera", "Camera", "capture", "rasterize"),
+    ("manimlib.camera.camera", "Camera", "capture_mobjects", "rasterize"),
+    ("manimlib.scene.scene_file_writer", "SceneFileWriter", "write_frame", "write_frame"),
+    ("manimlib.mobject.mobject", "Mobject", "become", "become"),
+    ("manimlib.mobject.svg.svg_mobject", "SVGMobject", "init_svg_mobject", "svg"),
+    ("manimlib.mobject.svg.svg_mobject", "SVGMobject", "generate_points", "svg"),
+]
+
+
+class SceneProfiler(object):
+    def __init__(self, directory=PROFILE_DIR):
+        self.directory = directory
+        self.stack = []
+        self.stacks = {}
+        self.plays = []
+
+    def start(self, name):
+        if tracemalloc.is_tracing():
+            memory, peak = tracemalloc.get_traced_memory()
+            if self.stack:
+                self.stack[-1]["peak"] = max(self.stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+        else:
+            memory = None
+        self.stack.append({
+            "name": name.replace(";", ","),
+            "start": time.perf_counter(),
+            "blocks": sys.getallocatedblocks(),
+            "memory": memory,
+            "peak": memory,
+            "children": 0,
+        })
+
+    def stop(self):
+        span = self.stack[-1]
+        total = time.perf_counter() - span["start"]
+        peak_kb = None
+        if span["memory"] is not None and tracemalloc.is_tracing():
+            span["peak"] = max(span["peak"], tracemalloc.get_traced_memory()[1])
+            peak_kb = (span["peak"] - span["memory"]) / 1024
+        blocks = sys.getallocatedblocks() - span["blocks"]
+
+        path = tuple(s["name"] for s in self.stack)
+        record = self.stacks.setdefault(path, {
+            "calls": 0, "time": 0, "self_time": 0, "blocks": 0, "peak_kb": None})
+        record["calls"] += 1
+        record["time"] += total
+        record["self_time"] += total - span["children"]
+        record["blocks"] += blocks
+        if peak_kb is not None:
+            record["peak_kb"] = max(record["peak_kb"] or 0, peak_kb)
+
+        self.stack.pop()
+        if self.stack:
+            self.stack[-1]["children"] += total
+            if span["peak"] is not None:
+                self.stack[-1]["peak"] = max(self.stack[-1]["peak"] or 0, span["peak"])
+                tracemalloc.reset_peak()
+        return dict(time=total, blocks=blocks, peak_kb=peak_kb)
+
+    def span(self, name, func, *args, **kwargs):
+        # Overridden methods calling their base aren't counted twice
+        if self.stack and self.stack[-1]["name"] == name:
+            return func(*args, **kwargs)
+        self.start(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.stop()
+
+    def play(self, scene, kind, method, args, kwargs):
+        animations = [
+            type(arg).__name__ for arg in args
+            if hasattr(arg, "begin") or hasattr(arg, "build")
+        ]
+        location = get_caller_location()
+        self.start(f"{kind} {len(self.plays)} {location}")
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.plays.append(dict(
+                self.stop(),
+                index=len(self.plays),
+                kind=kind,
+                location=location,
+                animations=animations,
+            ))
+
+    def begin_scene(self, scene):
+        self.stack = []
+        self.stacks = {}
+        self.plays = []
+        self.start(type(scene).__name__)
+
+    def end_scene(self, scene):
+        wall_time = self.stop()["time"]
+        name = f"{type(scene).__module__}.{type(scene).__name__}"
+        stages = {}
+        updaters = {}
+        for path, record in self.stacks.items():
+            table = updaters if path[-1].startswith("updater ") else stages
+            if len(path) > 1 and not path[-1].split(" ")[0] in ("play", "wait"):
+                total = table.setdefault(path[-1], {"calls": 0, "time": 0, "self_time": 0, "blocks": 0})
+                for key in total:
+                    total[key] += record[key]
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name + ".json"), "w") as f:
+            json.dump({
+                "scene": name,
+                "wall_time": wall_time,
+                "plays": self.plays,
+                "stages": stages,
+                "updaters": updaters,
+                "stacks": [
+                    dict(record, stack=list(path))
+                    for path, record in self.stacks.items()
+                ],
+            }, f, indent=1)
+        with open(os.path.join(self.directory, name + ".folded"), "w") as f:
+            f.write(get_folded(self.stacks, prefix=type(scene).__module__))
+
+
+def get_caller_location(skip_functions=()):
+    '''
+    file:line of the first frame calling into manimlib from outside it,
+    and outside any function named in skip_functions.
+    '''
+    frame = sys._getframe(1)
+    while frame is not None:
+        file_name = frame.f_code.co_filename
+        if ("manimlib" not in file_name and os.path.basename(file_name) not in RUNNER_FILES
+                and frame.f_code.co_name not in skip_functions):
+            return f"{os.path.basename(file_name)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "?"
+
+
+def get_folded(stacks, prefix=None):
+    '''
+    One "frame;frame;frame microseconds" line of self time per stack.
+    '''
+    lines = []
+    for path, record in stacks.items():
+        path = ([prefix] if prefix else []) + list(path)
+        lines.append(f"{';'.join(path)} {int(record['self_time'] * 1e6)}\n")
+    return "".join(lines)
+
+
+class ProfiledUpdater(object):
+    '''
+    An updater that records its calls. It compares equal to the function
+    it wraps, so remove_updater still finds it, and has its signature,
+    so dt is still passed to the updaters that take it.
+    '''
+    def __init__(self, func, profiler):
+        self.__wrapped__ = func
+        self.profiler = profiler
+        code = getattr(func, "__code__", None)
+        self.name = f"updater {getattr(func, '__qualname__', type(func).__name__)}"
+        if code is not None:
+            self.name += f" {os.path.basename(code.co_filename)}:{code.co_firstlineno}"
+
+    def __call__(self, *args, **kwargs):
+        return self.profiler.span(self.name, self.__wrapped__, *args, **kwargs)
+
+    def __eq__(self, other):
+        if isinstance(other, ProfiledUpdater):
+            other = other.__wrapped__
+        return self.__wrapped__ == other
+
+    def __hash__(self):
+        return hash(self.__wrapped__)
+
+    # Shared like the function it wraps when mobjects are copied
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getattr__(self, attr):
+        # Not set yet while unpickling
+        if attr == "__wrapped__":
+            raise AttributeError(attr)
+        return getattr(self.__wrapped__, attr)
+
+
+def profile_method(cls, name, stage, profiler):
+    method = cls.__dict__[name]
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        return profiler.span(stage, method, *args, **kwargs)
+    setattr(cls, name, wrapper)
+
+
+def get_subclasses(cls):
+    return [cls] + [c for sub in cls.__subclasses__() for c in get_subclasses(sub)]
+
+
+def install_profiler(directory=PROFILE_DIR):
+    '''
+    Profiles every scene run from now on, with whichever manim is
+    installed, which must be imported already.
+    '''
+    import importlib
+
+    from manimlib.mobject.mobject import Mobject
+    from manimlib.scene.scene import Scene
+
+    profiler = SceneProfiler(directory)
+
+    for module_name, class_name, method, stage in CLASS_STAGES:
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError):
+            continue
+        for sub in get_subclasses(cls):
+            if method in sub.__dict__:
+                profile_method(sub, method, stage, profiler)
+
+    # Imported by name where it's used
+    try:
+        import manimlib.mobject.svg.tex_mobject as tex_mobject
+    except ImportError:
+        tex_mobject = None
+    if hasattr(tex_mobject, "tex_to_svg_file"):
+        tex_to_svg_file = tex_mobject.tex_to_svg_file
+
+        @wraps(tex_to_svg_file)
+        def profiled_tex_to_svg_file(*args, **kwargs):
+            return profiler.span("tex", tex_to_svg_file, *args, **kwargs)
+        tex_mobject.tex_to_svg_file = profiled_tex_to_svg_file
+
+    add_updater = Mobject.add_updater
+
+    @wraps(add_updater)
+    def profiled_add_updater(self, update_function, *args, **kwargs):
+        if not isinstance(update_function, ProfiledUpdater):
+            update_function = ProfiledUpdater(update_function, profiler)
+        return add_updater(self, update_function, *args, **kwargs)
+    Mobject.add_updater = profiled_add_updater
+
+    def profile_scene(scene):
+        # On the instance, so overrides in scenes are timed too
+        for name, stage in SCENE_STAGES.items():
+            method = getattr(scene, name, None)
+            if callable(method):
+                setattr(scene, name, wraps(method)(
+                    lambda *a, _m=method, _s=stage, **k: profiler.span(_s, _m, *a, **k)))
+        for kind in ("play", "wait"):
+            method = getattr(scene, kind)
+            setattr(scene, kind, wraps(method)(
+                lambda *a, _m=method, _k=kind, **k: profiler.play(scene, _k, _m, a, k)))
+
+    if hasattr(Scene, "run"):
+        run = Scene.run
+
+        @wraps(run)
+        def profiled_run(self):
+            profile_scene(self)
+            profiler.begin_scene(self)
+            try:
+                return run(self)
+            finally:
+                profiler.end_scene(self)
+        Scene.run = profiled_run
+    else:
+        # The cairo Scene renders from __init__
+        init = Scene.__init__
+
+        @wraps(init)
+        def profiled_init(self, *args, **kwargs):
+            profile_scene(self)
+            profiler.begin_scene(self)
+            try:
+                return init(self, *args, **kwargs)
+            finally:
+                profiler.end_scene(self)
+        Scene.__init__ = profiled_init
+    return profiler
+
+
+def aggregate(directory=PROFILE_DIR):
+    '''
+    Totals of every report in directory: the time of each scene, and of
+    each stage and updater over all of them, slowest first. Also writes
+    all.folded, the stacks of every scene together.
+    '''
+    reports = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json") and name != "all.json":
+            with open(os.path.join(directory, name)) as f:
+                reports.append(json.load(f))
+
+    totals = {"stages": {}, "updaters": {}}
+    for report in reports:
+        for table in totals:
+            for name, record in report[table].items():
+                total = totals[table].setdefault(name, {"calls": 0, "time": 0, "scenes": []})
+                total["calls"] += record["calls"]
+                total["time"] += record["time"]
+                total["scenes"].append(report["scene"])
+
+    with open(os.path.join(directory, "all.folded"), "w") as f:
+        for report in reports:
+            module = report["scene"].rsplit(".", 1)[0]
+            stacks = {tuple(r["stack"]): r for r in report["stacks"]}
+            f.write(get_folded(stacks, prefix=module))
+
+    return {
+        "scenes": sorted(
+            ((r["scene"], r["wall_time"]) for r in reports), key=lambda s: -s[1]),
+        "stages": sorted(totals["stages"].items(), key=lambda s: -s[1]["time"]),
+        "updaters": sorted(totals["updaters"].items(), key=lambda s: -s[1]["time"]),
+    }
+
+
+def print_aggregate(totals, limit=10):
+    print("Slowest scenes")
+    for name, wall_time in totals["scenes"][:limit]:
+        print(f"  {wall_time:8.1f}s  {name}")
+    for table in ("stages", "updaters"):
+        print(f"Slowest {table}")
+        for name, total in totals[table][:limit]:
+            print(f"  {total['time']:8.1f}s  {total['calls']:>8} calls  {name}  "
+                  f"({len(total['scenes'])} scenes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sum up the reports of profiled scenes")
+    parser.add_argument("-d", "--directory", default=PROFILE_DIR)
+    parser.add_argument("-n", "--limit", type=int, default=10, help="rows of each table")
+    args = parser.parse_args()
+    print_aggregate(aggregate(args.directory), args.limit)
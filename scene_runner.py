@@ -0,0 +1,1320 @@
+'''
+Renders manimgl scenes the way the manimgl command does, with extra
+options for rendering on the farm. Anything it doesn't know is passed
+on to manimgl:
+
+    python scene_runner.py zagier.py WindmillIntro -w --play-cache
+'''
+import argparse
+import ast
+import hashlib
+import inspect
+import json
+import os
+import queue
+import random
+import shutil
+import sys
+import threading
+import time
+import traceback
+import types
+from contextlib import contextmanager
+from functools import partial, wraps
+
+import numpy as np
+
+from render_profiles import PROFILES, install_profile
+from mobject_stats import STATS_DIR, install_mobject_stats, parse_budgets
+from scene_profiler import PROFILE_DIR, RUNNER_FILES, install_profiler
+
+FRAME_BUFFERS = 4
+PLAY_CACHE_DIR = ".play_cache"
+PLAY_CACHE_SIZE = 2 * 1024 ** 3
+CHECKPOINT_DIR = ".checkpoints"
+ASSET_CACHE_DIR = ".asset_cache"
+
+# Functions called with the configuration manimgl builds from the command
+# line, before any scene is created
+config_hooks = []
+
+_file_hashes = {}
+
+
+def hash_file(path):
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _file_hashes:
+        with open(path, "rb") as f:
+            _file_hashes[key] = hashlib.sha1(f.read()).hexdigest()
+    return _file_hashes[key]
+
+
+def hash_folder(path):
+    return [
+        (name, hash_file(os.path.join(path, name)))
+        for name in sorted(os.listdir(path))
+        if os.path.isfile(os.path.join(path, name))
+    ]
+
+
+class Uncacheable(Exception):
+    pass
+
+
+def hash_code(code, h):
+    h.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            hash_code(const, h)
+        else:
+            h.update(repr(const).encode())
+
+
+def get_global_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            names |= get_global_names(const)
+    return names
+
+
+def hash_function(func, h, seen=None, depth=0, scene=None):
+    '''
+    Hashes a function by its code and by everything it reads that isn't
+    an argument: the contents of its closure, its defaults, the module
+    globals it names and, when it has the scene as self or in its
+    closure, the scene attributes and methods it names.
+    '''
+    from manimlib.scene.scene import Scene
+
+    seen = set() if seen is None else seen
+    owner = getattr(func, "__self__", None)
+    func = getattr(func, "__func__", func)
+    # Updaters wrapped by scene_profiler.py
+    func = getattr(func, "__wrapped__", func)
+    if isinstance(func, partial):
+        hash_function(func.func, h, seen, depth + 1, scene)
+        hash_value([func.args, func.keywords], h, seen, depth + 1)
+        return
+    h.update(getattr(func, "__qualname__", type(func).__name__).encode())
+    if not hasattr(func, "__code__") or id(func) in seen:
+        return
+    # What manimlib and other packages do only changes with their version
+    file_name = func.__code__.co_filename
+    if "manimlib" in file_name or "-packages" in file_name:
+        h.update(f"{func.__module__}".encode())
+        return
+    seen.add(id(func))
+    hash_code(func.__code__, h)
+    cells = []
+    for cell in func.__closure__ or ():
+        try:
+            cells.append(cell.cell_contents)
+        except ValueError:
+            # Not assigned yet
+            cells.append(None)
+    hash_value(cells, h, seen, depth + 1)
+    hash_value([func.__defaults__, func.__kwdefaults__], h, seen, depth + 1)
+    names = sorted(get_global_names(func.__code__))
+    globals_ = func.__globals__
+    hash_value({name: globals_[name] for name in names if name in globals_}, h, seen, depth + 1)
+
+    for value in [owner] + cells:
+        if isinstance(value, Scene):
+            scene = value
+    if scene is not None:
+        hash_scene_attributes(scene, names, h, seen, depth + 1)
+
+
+def hash_scene_attributes(scene, names, h, seen, depth):
+    '''
+    Hashes the attributes of scene in names, leaving out its camera, file
+    writer and the rest of manimlib's machinery, and the code of its
+    methods in names.
+    '''
+    from manimlib.animation.animation import Animation
+    from manimlib.mobject.mobject import Mobject
+
+    for name in names:
+        if name in scene.__dict__:
+            value = scene.__dict__[name]
+            if (type(value).__module__.startswith("manimlib")
+                    and not isinstance(value, (Mobject, Animation))):
+                continue
+            h.update(name.encode())
+            hash_value(value, h, seen, depth)
+        elif callable(getattr(type(scene), name, None)):
+            hash_function(getattr(type(scene), name), h, seen, depth, scene)
+
+
+def hash_mobject(mobject, h, seen=None, depth=0):
+    '''
+    Everything that decides how mobject and its family are drawn.
+    '''
+    seen = set() if seen is None else seen
+    for sm in mobject.get_family():
+        seen.add(id(sm))
+        h.update(type(sm).__name__.encode())
+        for name in sorted(sm.data):
+            h.update(name.encode())
+            h.update(np.ascontiguousarray(sm.data[name]).tobytes())
+        for name in sorted(sm.uniforms):
+            h.update(f"{name}={np.asarray(sm.uniforms[name]).tolist()}".encode())
+        h.update(f"{sm.depth_test}".encode())
+        if os.path.isdir(sm.shader_folder):
+            h.update(repr(hash_folder(sm.shader_folder)).encode())
+        for path in (sm.texture_paths or {}).values():
+            h.update(path.encode())
+            if os.path.isfile(path):
+                h.update(hash_file(path).encode())
+        for updater in sm.get_updaters():
+            hash_function(updater, h, seen, depth + 1)
+
+
+def hash_value(value, h, seen=None, depth=0):
+    '''
+    Hashes the arguments of a play call. Mobjects are hashed by their
+    state, animations by their type and attributes and functions by
+    their code and what it reads. Raises Uncacheable for values that
+    can only be told apart by their address.
+    '''
+    from manimlib.animation.animation import Animation
+    from manimlib.mobject.mobject import Mobject
+    from manimlib.scene.scene import Scene
+
+    seen = set() if seen is None else seen
+    if id(value) in seen or depth > 8:
+        h.update(b"...")
+        return
+    if isinstance(value, Mobject):
+        hash_mobject(value, h, seen, depth)
+    elif isinstance(value, Scene):
+        # Its mobjects are part of every key already
+        h.update(type(value).__name__.encode())
+    elif isinstance(value, (type, types.ModuleType)):
+        h.update(f"{getattr(value, '__module__', '')}.{value.__name__}".encode())
+    elif isinstance(value, Animation):
+        seen.add(id(value))
+        h.update(type(value).__name__.encode())
+        for name in sorted(value.__dict__):
+            h.update(name.encode())
+            hash_value(value.__dict__[name], h, seen, depth + 1)
+    elif isinstance(value, dict):
+        for name in sorted(value, key=repr):
+            h.update(repr(name).encode())
+            hash_value(value[name], h, seen, depth + 1)
+    elif isinstance(value, (list, tuple, set)):
+        h.update(type(value).__name__.encode())
+        for item in value:
+            hash_value(item, h, seen, depth + 1)
+    elif isinstance(value, np.ndarray):
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif (callable(value) and not hasattr(value, "__dict__") or hasattr(value, "__code__")
+            or isinstance(value, partial)):
+        hash_function(value, h, seen, depth)
+        hash_value(getattr(value, "__self__", None), h, seen, depth + 1)
+    elif hasattr(value, "__dict__"):
+        # Objects with the default repr would hash their address
+        seen.add(id(value))
+        h.update(type(value).__name__.encode())
+        hash_value(vars(value), h, seen, depth + 1)
+    else:
+        text = repr(value)
+        if " at 0x" in text:
+            raise Uncacheable(text)
+        h.update(text.encode())
+
+
+class PlayCache(object):
+    '''
+    Rendered partial movies of play and wait calls, keyed by the state of
+    every mobject in the scene before the call and the arguments given to
+    it. The directory is kept under max_size bytes by deleting the least
+    recently used movies.
+    '''
+    def __init__(self, directory=PLAY_CACHE_DIR, max_size=PLAY_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        os.makedirs(directory, exist_ok=True)
+        self.evict()
+
+    def get_key(self, scene, method, args, kwargs):
+        from manimlib.animation.animation import Animation
+        from manimlib.mobject.mobject import Mobject
+
+        # Skipping a play moves time based updaters on by a different dt
+        # than rendering it, so what follows a replayed one would differ
+        mobjects = list(scene.mobjects) + [
+            getattr(arg, "mobject", arg) for arg in args
+            if isinstance(arg, (Mobject, Animation))
+        ]
+        for mobject in mobjects:
+            if isinstance(mobject, Mobject) and any(
+                    sm.has_time_based_updater() for sm in mobject.get_family()):
+                raise Uncacheable(f"{mobject} has a time based updater")
+
+        h = hashlib.sha1()
+        camera = scene.camera
+        h.update(f"{method} {camera.get_pixel_shape()} {camera.frame_rate}".encode())
+        h.update(scene.file_writer.movie_file_extension.encode())
+        seen = set()
+        for mobject in scene.mobjects:
+            hash_mobject(mobject, h, seen)
+        hash_value(args, h, seen)
+        hash_value(kwargs, h, seen)
+        return h.hexdigest()
+
+    def get_path(self, key, extension):
+        return os.path.join(self.directory, key + extension)
+
+    def get(self, key, extension):
+        path = self.get_path(key, extension)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        os.utime(path)
+        return path
+
+    def put(self, key, file_path):
+        if not os.path.exists(file_path):
+            return
+        _, extension = os.path.splitext(file_path)
+        path = self.get_path(key, extension)
+        shutil.copyfile(file_path, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            os.remove(path)
+            total -= size
+
+
+def cached_play_like(method):
+    '''
+    Wraps Scene.play or Scene.wait so that a call whose key is in the play
+    cache runs without rendering and copies the cached movie in place of
+    its partial movie.
+    '''
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, "play_cache", None)
+        writer = self.file_writer
+        if (cache is None or self.skip_animations or not writer.write_to_movie
+                or self.start_at_animation_number is not None):
+            return method(self, *args, **kwargs)
+
+        try:
+            key = cache.get_key(self, method.__name__, args, kwargs)
+        except Uncacheable:
+            cache.uncacheable += 1
+            return method(self, *args, **kwargs)
+        partial_path = writer.get_next_partial_movie_path()
+        cached = cache.get(key, writer.movie_file_extension)
+        if cached is None:
+            result = method(self, *args, **kwargs)
+            cache.put(key, partial_path)
+            return result
+
+        self.force_skipping()
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            self.revert_to_original_skipping_status()
+        shutil.copyfile(cached, partial_path)
+        return result
+    return wrapper
+
+
+def install_play_cache(directory=PLAY_CACHE_DIR, max_size=PLAY_CACHE_SIZE):
+    from manimlib.scene.scene import Scene
+
+    def use_partial_movies(config):
+        config["file_writer_config"]["break_into_partial_movies"] = True
+
+    config_hooks.append(use_partial_movies)
+    Scene.play_cache = PlayCache(directory, max_size)
+    Scene.play = cached_play_like(Scene.play)
+    Scene.wait = cached_play_like(Scene.wait)
+    return Scene.play_cache
+
+
+class Checkpoints(object):
+    '''
+    Snapshots of a scene taken right after top level self.play and
+    self.wait statements of its construct. Each one holds the scene's
+    mobjects, camera frame and attributes, the local variables of
+    construct, so trackers and everything else built so far, and the
+    random state, pickled with dill when it's installed so updaters and
+    other lambdas survive.
+
+    Resuming restores the latest snapshot whose key still matches and
+    runs only the statements of construct after it. The key hashes the
+    scene's module without the rest of construct, so editing the end of
+    construct keeps earlier snapshots valid while any other edit drops
+    them. The partial movies of the plays before the snapshot are reused.
+    '''
+    def __init__(self, directory=CHECKPOINT_DIR, every=1):
+        self.directory = directory
+        self.every = every
+        self.constructs = {}
+        self.saved = 0
+
+    def get_construct(self, scene):
+        '''
+        The code of scene's construct, its file, its source and its top
+        level statements.
+        '''
+        func = type(scene).construct
+        if func not in self.constructs:
+            file_name = inspect.getsourcefile(func)
+            with open(file_name) as f:
+                source = f.read()
+            body = []
+            for node in ast.walk(ast.parse(source)):
+                if (isinstance(node, ast.FunctionDef) and node.name == func.__name__
+                        and min([node.lineno] + [d.lineno for d in node.decorator_list])
+                        == func.__code__.co_firstlineno):
+                    body = node.body
+            self.constructs[func] = (func.__code__, file_name, source, body)
+        return self.constructs[func]
+
+    def get_construct_frame(self, scene, frame):
+        '''
+        The frame of construct, or of what is left of it after resuming,
+        that frame was called from through the wrappers of RUNNER_FILES.
+        '''
+        codes = (self.get_construct(scene)[0], getattr(scene, "resumed_code", None))
+        while frame is not None and frame.f_code not in codes:
+            if os.path.basename(frame.f_code.co_filename) not in RUNNER_FILES:
+                return None
+            frame = frame.f_back
+        return frame
+
+    def get_key(self, scene, index):
+        _, file_name, source, body = self.get_construct(scene)
+        lines = source.splitlines(keepends=True)
+        if index + 1 < len(body):
+            start, end = body[index + 1].lineno, body[-1].end_lineno
+            lines = lines[:start - 1] + lines[end:]
+        h = hashlib.sha1("".join(lines).encode())
+        camera = scene.camera
+        h.update(f"{scene} {camera.get_pixel_shape()} {camera.frame_rate}".encode())
+        return h.hexdigest()
+
+    def get_path(self, scene, index, key):
+        module = type(scene).__module__
+        return os.path.join(self.directory, f"{module}.{scene}", f"{index:04}_{key}.pkl")
+
+    def get_statement_index(self, scene, frame):
+        '''
+        Index of the top level statement of construct that frame is at,
+        if it is nothing but a self.play or self.wait call.
+        '''
+        frame = self.get_construct_frame(scene, frame)
+        if frame is None:
+            return None
+        body = self.get_construct(scene)[3]
+        for index, stmt in enumerate(body):
+            if stmt.lineno <= frame.f_lineno <= stmt.end_lineno:
+                is_play = (
+                    isinstance(stmt, ast.Expr)
+                    and isinstance(stmt.value, ast.Call)
+                    and isinstance(stmt.value.func, ast.Attribute)
+                    and stmt.value.func.attr in ("play", "wait")
+                )
+                return index if is_play else None
+        return None
+
+    def save(self, scene, frame):
+        index = self.get_statement_index(scene, frame)
+        if index is None or scene.num_plays % self.every:
+            return
+        frame = self.get_construct_frame(scene, frame)
+
+        key = self.get_key(scene, index)
+        path = self.get_path(scene, index, key)
+        state = {
+            "index": index,
+            "time": scene.time,
+            "num_plays": scene.num_plays,
+            "mobjects": scene.mobjects,
+            "frame": scene.camera.frame,
+            "attributes": {
+                k: v for k, v in scene.__dict__.items()
+                if k not in scene.init_attributes
+            },
+            "locals": {k: v for k, v in frame.f_locals.items() if k != "self"},
+            "random": random.getstate(),
+            "np_random": np.random.get_state(),
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for name in os.listdir(os.path.dirname(path)):
+            if name.startswith(f"{index:04}_"):
+                os.remove(os.path.join(os.path.dirname(path), name))
+        try:
+            with open(path + ".tmp", "wb") as f:
+                self.get_pickler(f, scene).dump(state)
+            os.replace(path + ".tmp", path)
+            self.saved += 1
+        except Exception as e:
+            os.remove(path + ".tmp")
+            log_warning(f"Couldn't save a checkpoint of {scene} at play {scene.num_plays}: {e}")
+            self.every = float("inf")
+
+    def get_pickler(self, file, scene):
+        pickle = get_pickle_module()
+
+        class Pickler(pickle.Pickler):
+            # The scene itself, with its window and camera, is recreated
+            def persistent_id(self, obj):
+                return "scene" if obj is scene else None
+        return Pickler(file)
+
+    def load(self, path, scene):
+        pickle = get_pickle_module()
+
+        class Unpickler(pickle.Unpickler):
+            def persistent_load(self, pid):
+                return scene
+        with open(path, "rb") as f:
+            return Unpickler(f).load()
+
+    def find_latest(self, scene):
+        _, _, _, body = self.get_construct(scene)
+        for index in reversed(range(len(body))):
+            path = self.get_path(scene, index, self.get_key(scene, index))
+            if os.path.exists(path):
+                return path
+        return None
+
+    def has_partial_movies(self, scene, num_plays):
+        writer = scene.file_writer
+        if not writer.write_to_movie:
+            return True
+        return all(
+            os.path.exists(os.path.join(
+                writer.partial_movie_directory, f"{n:05}{writer.movie_file_extension}"))
+            for n in range(num_plays)
+        )
+
+    def resume(self, scene):
+        '''
+        Runs scene from its latest valid snapshot, returning False if there
+        is none and it has to run from the start.
+        '''
+        from manimlib.scene.scene import EndSceneEarlyException
+
+        path = self.find_latest(scene)
+        if path is None:
+            return False
+        state = self.load(path, scene)
+        if not self.has_partial_movies(scene, state["num_plays"]):
+            return False
+
+        _, file_name, _, body = self.get_construct(scene)
+        rest = body[state["index"] + 1:]
+        names = list(state["locals"]) + ["self"]
+        first = rest[0].lineno if rest else body[-1].end_lineno
+        last = rest[-1].end_lineno if rest else first
+        location = dict(lineno=first, end_lineno=first, col_offset=0, end_col_offset=0)
+        func = ast.FunctionDef(
+            name="construct",
+            args=ast.arguments(posonlyargs=[], args=[], kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=[ast.Global(names=names, **location)] + (rest or [ast.Pass(**location)]),
+            decorator_list=[],
+            **dict(location, end_lineno=last),
+        )
+        module = ast.fix_missing_locations(ast.Module(body=[func], type_ignores=[]))
+        namespace = dict(type(scene).construct.__globals__)
+        namespace.update(state["locals"], self=scene)
+        exec(compile(module, file_name, "exec"), namespace)
+        scene.resumed_code = namespace["construct"].__code__
+        scene.init_attributes.add("resumed_code")
+
+        scene.__dict__.update(state["attributes"])
+        scene.mobjects = state["mobjects"]
+        scene.camera.frame = state["frame"]
+        scene.time = state["time"]
+        scene.num_plays = state["num_plays"]
+        random.setstate(state["random"])
+        np.random.set_state(state["np_random"])
+        print(f"Resuming {scene} after play {scene.num_plays}")
+
+        try:
+            namespace["construct"]()
+        except EndSceneEarlyException:
+            pass
+        return True
+
+
+def get_pickle_module():
+    try:
+        import dill
+        return dill
+    except ImportError:
+        import pickle
+        return pickle
+
+
+def log_warning(message):
+    from manimlib.logger import log
+    log.warning(message)
+
+
+def checkpointed_play_like(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        checkpoints = getattr(self, "checkpoints", None)
+        if checkpoints is not None and not self.skip_animations and self.file_writer.write_to_movie:
+            checkpoints.save(self, sys._getframe(1))
+        return result
+    return wrapper
+
+
+def install_checkpoints(directory=CHECKPOINT_DIR, every=1, resume=False):
+    from manimlib.scene.scene import Scene
+
+    def use_partial_movies(config):
+        config["file_writer_config"]["break_into_partial_movies"] = True
+
+    config_hooks.append(use_partial_movies)
+    Scene.checkpoints = Checkpoints(directory, every or float("inf"))
+    Scene.play = checkpointed_play_like(Scene.play)
+    Scene.wait = checkpointed_play_like(Scene.wait)
+
+    run = Scene.run
+
+    @wraps(run)
+    def run_from_checkpoint(self):
+        from manimlib.scene.scene import EndSceneEarlyException
+
+        self.init_attributes = set(self.__dict__) | {"init_attributes"}
+        self.checkpoints.saved = 0
+        if not resume:
+            run(self)
+            if (not self.checkpoints.saved and self.num_plays >= self.checkpoints.every
+                    and not self.skip_animations and self.file_writer.write_to_movie):
+                log_warning(
+                    f"No checkpoint of {self} was saved, none of its plays and waits "
+                    f"are top level statements of construct")
+            return
+        self.virtual_animation_start_time = 0
+        self.real_animation_start_time = time.time()
+        self.file_writer.begin()
+        self.setup()
+        self.init_attributes = set(self.__dict__) | {"init_attributes"}
+        if not self.checkpoints.resume(self):
+            try:
+                self.construct()
+            except EndSceneEarlyException:
+                pass
+        self.tear_down()
+    Scene.run = run_from_checkpoint
+    return Scene.checkpoints
+
+
+class StillFrame(object):
+    '''
+    Stands in for the camera to write a frame that was already read.
+    '''
+    def __init__(self, raw_bytes):
+        self.raw_bytes = raw_bytes
+
+    def get_raw_fbo_data(self, dtype="f1"):
+        return self.raw_bytes
+
+
+class StillFrames(object):
+    '''
+    Waits during which nothing in the scene can move are rasterized once,
+    and that frame is written again for the rest of the wait. Nothing can
+    move when no mobject in the scene, the camera frame included, has an
+    updater and the wait has no stop condition.
+
+    Only manimgl needs this. The cairo manim's Scene.wait already captures
+    a single frame for waits where nothing updates and adds it once per
+    frame of the wait, so cairo scenes like prime.IntroQuote render
+    their waits that way through manim.py as they are.
+    '''
+    def __init__(self):
+        self.rendered = 0
+        self.reused = 0
+
+    def is_still(self, scene, stop_condition):
+        return (
+            stop_condition is None
+            and scene.window is None
+            and not scene.presenter_mode
+            and not scene.skip_animations
+            and scene.file_writer.write_to_movie
+            and not any(m.get_family_updaters() for m in scene.mobjects)
+        )
+
+
+def install_still_frames():
+    from manimlib.scene.scene import Scene
+
+    still_frames = StillFrames()
+    wait = Scene.wait
+    update_frame = Scene.update_frame
+    emit_frame = Scene.emit_frame
+    signature = inspect.signature(wait)
+
+    @wraps(wait)
+    def still_wait(self, *args, **kwargs):
+        stop_condition = signature.bind(self, *args, **kwargs).arguments.get("stop_condition")
+        # Empty until the first frame of the wait is read
+        self.held_frame = b"" if still_frames.is_still(self, stop_condition) else None
+        try:
+            return wait(self, *args, **kwargs)
+        finally:
+            self.held_frame = None
+
+    @wraps(update_frame)
+    def still_update_frame(self, dt=0, ignore_skipping=False):
+        if self.held_frame:
+            self.increment_time(dt)
+            return
+        update_frame(self, dt, ignore_skipping)
+
+    @wraps(emit_frame)
+    def still_emit_frame(self):
+        if self.held_frame is None or self.skip_animations:
+            emit_frame(self)
+        elif self.held_frame:
+            self.file_writer.write_frame(StillFrame(self.held_frame))
+            still_frames.reused += 1
+        else:
+            emit_frame(self)
+            self.held_frame = self.camera.get_raw_fbo_data()
+            still_frames.rendered += 1
+
+    Scene.held_frame = None
+    Scene.wait = still_wait
+    Scene.update_frame = still_update_frame
+    Scene.emit_frame = still_emit_frame
+    return still_frames
+
+
+def read_frame(camera, buffer):
+    '''
+    Same as Camera.get_raw_fbo_data, reading into buffer instead of a
+    new bytes object.
+    '''
+    import OpenGL.GL as gl
+
+    if not hasattr(camera, "fbo"):
+        buffer[:] = camera.get_raw_fbo_data()
+        return
+    pw, ph = (camera.pixel_width, camera.pixel_height)
+    gl.glBindFramebuffer(gl.GL_READ_FRAMEBUFFER, camera.fbo_msaa.glo)
+    gl.glBindFramebuffer(gl.GL_DRAW_FRAMEBUFFER, camera.fbo.glo)
+    gl.glBlitFramebuffer(0, 0, pw, ph, 0, 0, pw, ph, gl.GL_COLOR_BUFFER_BIT, gl.GL_LINEAR)
+    camera.fbo.read_into(
+        buffer,
+        viewport=camera.fbo.viewport,
+        components=camera.n_channels,
+        dtype="f1",
+    )
+
+
+class FrameWriter(object):
+    '''
+    Hands frames to ffmpeg on a thread of its own, so the next frame is
+    rasterized while the last ones are piped to the encoder. Frames are
+    read straight into a fixed pool of buffers allocated with the first
+    one, and rendering only waits when all of them are queued. Records
+    how deep the queue gets and how long each side waits for the other.
+    '''
+    def __init__(self, num_buffers=FRAME_BUFFERS):
+        self.num_buffers = num_buffers
+        self.size = None
+        self.free = queue.Queue()
+        self.frames = queue.Queue()
+        self.error = None
+        self.count = 0
+        self.total_depth = 0
+        self.max_depth = 0
+        self.render_wait = 0
+        self.encode_wait = 0
+        threading.Thread(target=self.encode, daemon=True).start()
+
+    def allocate(self, size):
+        self.flush()
+        while not self.free.empty():
+            self.free.get()
+        for _ in range(self.num_buffers):
+            self.free.put(bytearray(size))
+        self.size = size
+
+    def write(self, camera, stdin):
+        if self.error is not None:
+            raise self.error
+        if hasattr(camera, "fbo"):
+            size = camera.pixel_width * camera.pixel_height * camera.n_channels
+        else:
+            size = len(camera.get_raw_fbo_data())
+        if size != self.size:
+            self.allocate(size)
+
+        start = time.time()
+        buffer = self.free.get()
+        self.render_wait += time.time() - start
+        read_frame(camera, buffer)
+        self.frames.put((stdin, buffer))
+
+        depth = self.frames.qsize()
+        self.count += 1
+        self.total_depth += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def encode(self):
+        while True:
+            start = time.time()
+            stdin, buffer = self.frames.get()
+            self.encode_wait += time.time() - start
+            try:
+                if self.error is None:
+                    stdin.write(buffer)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.free.put(buffer)
+                self.frames.task_done()
+
+    def flush(self):
+        self.frames.join()
+        if self.error is not None:
+            raise self.error
+
+    def print_report(self):
+        if not self.count:
+            return
+        bottleneck = "encoding" if self.render_wait > self.encode_wait else "rendering"
+        print(
+            f"Frame writer: {self.count} frames through {self.num_buffers} buffers, "
+            f"queue depth {self.total_depth / self.count:.1f} on average and {self.max_depth} at most, "
+            f"rendering waited {self.render_wait:.1f}s for buffers and encoding "
+            f"{self.encode_wait:.1f}s for frames ({bottleneck} is the bottleneck)"
+        )
+
+
+def install_frame_writer(num_buffers=FRAME_BUFFERS):
+    from manimlib.scene.scene_file_writer import SceneFileWriter
+
+    frame_writer = FrameWriter(num_buffers)
+    close_movie_pipe = SceneFileWriter.close_movie_pipe
+
+    @wraps(SceneFileWriter.write_frame)
+    def write_frame(self, camera):
+        if self.write_to_movie:
+            frame_writer.write(camera, self.writing_process.stdin)
+            if self.has_progress_display:
+                self.progress_display.update()
+
+    @wraps(close_movie_pipe)
+    def flushed_close_movie_pipe(self):
+        frame_writer.flush()
+        close_movie_pipe(self)
+
+    SceneFileWriter.write_frame = write_frame
+    SceneFileWriter.close_movie_pipe = flushed_close_movie_pipe
+    return frame_writer
+
+
+class TexCache(object):
+    '''
+    The compiled svgs in the Tex directory, listed once so that tex strings
+    already compiled, by tex_cache.py or an earlier render, are looked up
+    in memory. Counts the strings found and the ones that had to be
+    compiled. manimgl hashes the whole tex file, the cairo manim the
+    expression and its template, so the key is whatever tex_hash takes.
+    '''
+    def __init__(self, tex_to_svg_file):
+        self.tex_to_svg_file = tex_to_svg_file
+        self.paths = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_tex_dir(self):
+        try:
+            from manimlib.utils.directories import get_tex_dir
+        except ImportError:
+            # The cairo manim sets it once the media directories are made
+            import manimlib.constants as consts
+            return consts.TEX_DIR
+        return get_tex_dir()
+
+    def get_svg_file(self, *args):
+        from manimlib.utils.tex_file_writing import tex_hash
+
+        if self.paths is None:
+            tex_dir = self.get_tex_dir()
+            self.paths = {
+                name[:-len(".svg")]: os.path.join(tex_dir, name)
+                for name in os.listdir(tex_dir) if name.endswith(".svg")
+            }
+        key = tex_hash(*args)
+        if key in self.paths:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.paths[key] = self.tex_to_svg_file(*args)
+        return self.paths[key]
+
+    def print_report(self):
+        if self.hits or self.misses:
+            print(f"TeX cache: {self.hits} hits, {self.misses} misses")
+
+
+def install_tex_cache():
+    '''
+    Works with either manim, both import tex_to_svg_file into tex_mobject.
+    '''
+    import manimlib.mobject.svg.tex_mobject as tex_mobject
+
+    tex_cache = TexCache(tex_mobject.tex_to_svg_file)
+    tex_mobject.tex_to_svg_file = tex_cache.get_svg_file
+    return tex_cache
+
+
+class AssetCache(object):
+    '''
+    Parsed svgs and decoded images, saved to directory keyed by the hash
+    of their file and memory mapped back in by later loads, in this
+    process or any other. Svgs are only saved if they come out as a flat
+    group of VMobjects, which is what SVGMobject and Tex produce, and
+    their pieces come back as plain VMobjects. In memory, manimgl svgs are
+    kept by its own SVG_HASH_TO_MOB_MAP. Records how many assets each
+    scene loaded, from where and how long it took.
+
+    Works with either manim. Cairo scenes get it through manim.py when
+    ASSET_CACHE is set; only their points are saved, as SVGMobject sets
+    the colors of all its pieces after parsing.
+    '''
+    def __init__(self, directory=ASSET_CACHE_DIR):
+        self.directory = directory
+        self.images = {}
+        self.scene = None
+        self.loads = {}
+        os.makedirs(os.path.join(directory, "svg"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "images"), exist_ok=True)
+
+    def log(self, kind, source, seconds):
+        loads = self.loads.setdefault(self.scene or "(module)", {})
+        count, total = loads.get((kind, source), (0, 0))
+        loads[(kind, source)] = (count + 1, total + seconds)
+
+    def get_svg_key(self, svg):
+        if hasattr(svg, "hash_seed"):
+            seed, path = svg.hash_seed, svg.get_file_path()
+        else:
+            # Subclasses of the cairo SVGMobject may parse differently
+            seed = (type(svg).__module__, type(svg).__qualname__, svg.unpack_groups)
+            path = svg.file_path
+        h = hashlib.sha1(repr(seed).encode())
+        h.update(hash_file(path).encode())
+        return h.hexdigest()
+
+    def load_svg(self, key):
+        from manimlib.mobject.types.vectorized_mobject import VMobject
+
+        folder = os.path.join(self.directory, "svg", key)
+        try:
+            with open(os.path.join(folder, "index.json")) as f:
+                index = json.load(f)
+            arrays = {
+                name: np.load(os.path.join(folder, name + ".npy"), mmap_mode="c")
+                for name in index["lengths"]
+            }
+        except (OSError, ValueError):
+            return None
+
+        mobjects = []
+        starts = dict.fromkeys(arrays, 0)
+        for i, uniforms in enumerate(index["uniforms"]):
+            mob = VMobject()
+            data = {}
+            for name, array in arrays.items():
+                end = starts[name] + index["lengths"][name][i]
+                data[name] = np.asarray(array[starts[name]:end])
+                starts[name] = end
+            if hasattr(mob, "data"):
+                mob.data.update(data)
+                mob.uniforms.update(uniforms)
+                mob.refresh_bounding_box()
+            else:
+                mob.points = data["points"]
+            mobjects.append(mob)
+        return mobjects
+
+    def save_svg(self, key, mobjects):
+        from manimlib.mobject.types.vectorized_mobject import VMobject
+
+        if not all(isinstance(m, VMobject) and not m.submobjects for m in mobjects):
+            return
+        # The cairo manim keeps nothing but points
+        datas = [getattr(m, "data", None) or {"points": m.points} for m in mobjects]
+        uniforms = [
+            {k: float(v) for k, v in getattr(m, "uniforms", {}).items() if np.ndim(v) == 0}
+            for m in mobjects
+        ]
+        if any(len(u) != len(getattr(m, "uniforms", {})) for u, m in zip(uniforms, mobjects)):
+            return
+        names = sorted(set.intersection(*[set(d) for d in datas])) if mobjects else []
+        folder = os.path.join(self.directory, "svg", key)
+        temp = folder + f".{os.getpid()}.tmp"
+        os.makedirs(temp, exist_ok=True)
+        for name in names:
+            np.save(os.path.join(temp, name + ".npy"), np.concatenate([d[name] for d in datas]))
+        with open(os.path.join(temp, "index.json"), "w") as f:
+            json.dump({
+                "lengths": {name: [len(d[name]) for d in datas] for name in names},
+                "uniforms": uniforms,
+            }, f)
+        try:
+            os.rename(temp, folder)
+        except OSError:
+            # Saved by another process in the meantime
+            shutil.rmtree(temp, ignore_errors=True)
+
+    def load_image(self, path, mode="RGBA"):
+        '''
+        The pixels of the image at path in a PIL mode, as an array of shape
+        (height, width, 4) for RGBA.
+        '''
+        from PIL import Image
+
+        key = hash_file(path) + ("" if mode == "RGBA" else "." + mode)
+        if key in self.images:
+            return self.images[key], "memory"
+        cache_path = os.path.join(self.directory, "images", key + ".npy")
+        try:
+            pixels, source = np.load(cache_path, mmap_mode="r"), "disk"
+        except (OSError, ValueError):
+            pixels, source = np.asarray(Image.open(path).convert(mode)), "decoded"
+            np.save(cache_path + f".{os.getpid()}.tmp.npy", pixels)
+            os.replace(cache_path + f".{os.getpid()}.tmp.npy", cache_path)
+        self.images[key] = pixels
+        return pixels, source
+
+    def print_report(self):
+        for scene, loads in self.loads.items():
+            parts = []
+            for kind in ("svg", "image"):
+                counts = {s: c for (k, s), (c, _) in loads.items() if k == kind}
+                if counts:
+                    seconds = sum(t for (k, _), (_, t) in loads.items() if k == kind)
+                    sources = ", ".join(f"{c} {s}" for s, c in counts.items())
+                    parts.append(f"{sum(counts.values())} {kind}s ({sources}) in {seconds:.2f}s")
+            print(f"Assets of {scene}: {'; '.join(parts)}")
+
+
+def install_asset_cache(directory=ASSET_CACHE_DIR):
+    from manimlib.scene.scene import Scene
+
+    if not hasattr(Scene, "run"):
+        return install_cairo_asset_cache(directory)
+    from manimlib.camera.camera import Camera
+    from manimlib.mobject.svg.svg_mobject import SVG_HASH_TO_MOB_MAP, SVGMobject
+    from manimlib.scene.scene import Scene
+    from manimlib.utils.iterables import hash_obj
+
+    asset_cache = AssetCache(directory)
+    init_svg_mobject = SVGMobject.init_svg_mobject
+    run = Scene.run
+
+    @wraps(init_svg_mobject)
+    def cached_init_svg_mobject(self):
+        start = time.time()
+        hash_val = hash_obj(self.hash_seed)
+        if hash_val in SVG_HASH_TO_MOB_MAP:
+            init_svg_mobject(self)
+            asset_cache.log("svg", "memory", time.time() - start)
+            return
+        key = asset_cache.get_svg_key(self)
+        mobjects = asset_cache.load_svg(key)
+        if mobjects is None:
+            init_svg_mobject(self)
+            asset_cache.save_svg(key, self.submobjects)
+            source = "parsed"
+        else:
+            self.add(*mobjects)
+            SVG_HASH_TO_MOB_MAP[hash_val] = self.copy()
+            source = "disk"
+        asset_cache.log("svg", source, time.time() - start)
+
+    # Same as Camera.get_texture_id, with the pixels from the cache
+    def get_texture_id(self, path):
+        if path not in self.path_to_texture:
+            if self.n_textures == 15:
+                self.n_textures += 1
+            tid = self.n_textures
+            self.n_textures += 1
+            start = time.time()
+            pixels, source = asset_cache.load_image(path)
+            texture = self.ctx.texture(
+                size=(pixels.shape[1], pixels.shape[0]),
+                components=4,
+                data=np.ascontiguousarray(pixels),
+            )
+            asset_cache.log("image", source, time.time() - start)
+            texture.use(location=tid)
+            self.path_to_texture[path] = (tid, texture)
+        return self.path_to_texture[path][0]
+
+    @wraps(run)
+    def run_logging_assets(self):
+        asset_cache.scene = str(self)
+        return run(self)
+
+    SVGMobject.init_svg_mobject = cached_init_svg_mobject
+    Camera.get_texture_id = get_texture_id
+    Scene.run = run_logging_assets
+    return asset_cache
+
+
+def install_cairo_asset_cache(directory=ASSET_CACHE_DIR):
+    from manimlib.mobject.svg.svg_mobject import SVGMobject
+    from manimlib.mobject.types.image_mobject import ImageMobject
+    from manimlib.scene.scene import Scene
+    from manimlib.utils.config_ops import digest_config
+    from manimlib.utils.images import get_full_raster_image_path
+
+    asset_cache = AssetCache(directory)
+    generate_points = SVGMobject.generate_points
+    image_init = ImageMobject.__init__
+    scene_init = Scene.__init__
+
+    @wraps(generate_points)
+    def cached_generate_points(self):
+        start = time.time()
+        key = asset_cache.get_svg_key(self)
+        mobjects = asset_cache.load_svg(key)
+        if mobjects is None:
+            generate_points(self)
+            asset_cache.save_svg(key, self.submobjects)
+            source = "parsed"
+        else:
+            self.add(*mobjects)
+            source = "disk"
+        asset_cache.log("svg", source, time.time() - start)
+
+    @wraps(image_init)
+    def cached_image_init(self, filename_or_array, **kwargs):
+        if isinstance(filename_or_array, str):
+            # For image_mode, ImageMobject.__init__ digests it again
+            digest_config(self, kwargs)
+            start = time.time()
+            path = get_full_raster_image_path(filename_or_array)
+            filename_or_array, source = asset_cache.load_image(path, self.image_mode)
+            asset_cache.log("image", source, time.time() - start)
+        image_init(self, filename_or_array, **kwargs)
+
+    # The cairo Scene renders from __init__
+    @wraps(scene_init)
+    def init_logging_assets(self, *args, **kwargs):
+        asset_cache.scene = str(self)
+        return scene_init(self, *args, **kwargs)
+
+    SVGMobject.generate_points = cached_generate_points
+    ImageMobject.__init__ = cached_image_init
+    Scene.__init__ = init_logging_assets
+    return asset_cache
+
+
+def do_nothing(*args, **kwargs):
+    pass
+
+
+@contextmanager
+def log_during_execution(message):
+    # manimgl's version needs a terminal to measure
+    print(message.split("\n")[0], flush=True)
+    yield
+
+
+def install_batch_mode():
+    '''
+    Renders without anyone watching: no window is opened, and embed and
+    interact do nothing, even where a scene overrides them or calls them
+    from construct. The cairo manim has no window, embed or interact to
+    turn off.
+    '''
+    import manimlib.mobject.svg.mtex_mobject as mtex_mobject
+    import manimlib.mobject.svg.tex_mobject as tex_mobject
+    from manimlib.scene.scene import Scene
+
+    def no_preview(config):
+        config["preview"] = False
+
+    config_hooks.append(no_preview)
+    init = Scene.__init__
+
+    @wraps(init)
+    def batch_init(self, **kwargs):
+        init(self, **kwargs)
+        self.embed = do_nothing
+        self.interact = do_nothing
+        self.linger_after_completion = False
+    Scene.__init__ = batch_init
+    tex_mobject.display_during_execution = log_during_execution
+    mtex_mobject.display_during_execution = log_during_execution
+
+
+def install_render_profile(name):
+    profile = PROFILES[name]
+
+    def use_profile(config):
+        camera_config = config["camera_config"]
+        if profile["resolution"]:
+            camera_config["pixel_width"], camera_config["pixel_height"] = profile["resolution"]
+        if profile["fps"]:
+            camera_config["frame_rate"] = profile["fps"]
+        # Drafts mustn't overwrite final renders
+        if name != "final":
+            writer_config = config["file_writer_config"]
+            writer_config["output_directory"] = os.path.join(writer_config["output_directory"], name)
+
+    config_hooks.append(use_profile)
+    install_profile(name)
+
+
+def install_config_hooks():
+    import manimlib.config
+    get_configuration = manimlib.config.get_configuration
+    get_module = manimlib.config.get_module
+
+    # Registered so pickles of the scene's mobjects can find its classes
+    @wraps(get_module)
+    def register_module(file_name):
+        module = get_module(file_name)
+        if module is not None:
+            sys.modules.setdefault(module.__name__, module)
+        return module
+    manimlib.config.get_module = register_module
+
+    @wraps(get_configuration)
+    def wrapper(args):
+        config = get_configuration(args)
+        for hook in config_hooks:
+            hook(config)
+        return config
+    manimlib.config.get_configuration = wrapper
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Render manimgl scenes, any other arguments are passed to manimgl")
+    parser.add_argument("--play-cache", action="store_true",
+                        help="reuse rendered play and wait calls whose scene state and arguments didn't change")
+    parser.add_argument("--play-cache-dir", default=PLAY_CACHE_DIR)
+    parser.add_argument("--play-cache-size", type=float, default=PLAY_CACHE_SIZE / 1024 ** 3,
+                        help="size limit of the play cache in GB")
+    parser.add_argument("--checkpoint-every", type=int, default=0, metavar="N",
+                        help="snapshot the scene after every Nth play or wait at the top level of construct")
+    parser.add_argument("--resume", action="store_true",
+                        help="start from the latest snapshot that is still valid")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR)
+    parser.add_argument("--asset-cache", action="store_true",
+                        help="keep parsed svgs and decoded images on disk and report asset load times")
+    parser.add_argument("--asset-cache-dir", default=ASSET_CACHE_DIR)
+    parser.add_argument("--no-still-frames", action="store_true",
+                        help="rasterize every frame of waits where nothing can move")
+    parser.add_argument("--frame-buffers", type=int, default=FRAME_BUFFERS, metavar="N",
+                        help="frames that can wait for the encoder, 0 to write them synchronously")
+    parser.add_argument("--profile", choices=sorted(PROFILES),
+                        default=os.environ.get("RENDER_PROFILE", "final"),
+                        help="see render_profiles.py")
+    parser.add_argument("--batch", action="store_true",
+                        help="no window, embed or interact, and exit as soon as the last scene is written")
+    parser.add_argument("--profiling", action="store_true",
+                        default=bool(os.environ.get("SCENE_PROFILING")),
+                        help="time every play, wait, updater and frame stage, see scene_profiler.py")
+    parser.add_argument("--profiling-dir", default=PROFILE_DIR)
+    parser.add_argument("--mobject-stats", action="store_true",
+                        default=bool(os.environ.get("MOBJECT_STATS")),
+                        help="measure the mobjects of every frame and warn about plays over budget, see mobject_stats.py")
+    parser.add_argument("--mobject-budget", type=parse_budgets,
+                        default=os.environ.get("MOBJECT_BUDGETS", ""), metavar="NAME=N,...",
+                        help="e.g. submobjects=5000,points=1e6")
+    parser.add_argument("--mobject-stats-dir", default=STATS_DIR)
+    return parser
+
+
+def main(argv=None):
+    args, manim_args = get_parser().parse_known_args(argv)
+
+    # Innermost, so caches and checkpoints see whole waits
+    still_frames = None
+    if not args.no_still_frames:
+        still_frames = install_still_frames()
+    frame_writer = None
+    if args.frame_buffers:
+        frame_writer = install_frame_writer(args.frame_buffers)
+    play_cache = None
+    if args.play_cache:
+        play_cache = install_play_cache(
+            args.play_cache_dir, int(args.play_cache_size * 1024 ** 3))
+    if args.checkpoint_every or args.resume:
+        install_checkpoints(args.checkpoint_dir, args.checkpoint_every, args.resume)
+    asset_cache = None
+    if args.asset_cache:
+        asset_cache = install_asset_cache(args.asset_cache_dir)
+    if args.batch:
+        install_batch_mode()
+    install_render_profile(args.profile)
+    tex_cache = install_tex_cache()
+    # Outermost, so what the caches save is taken off what they wrap
+    if args.profiling:
+        install_profiler(args.profiling_dir)
+    if args.mobject_stats:
+        install_mobject_stats(args.mobject_budget, args.mobject_stats_dir)
+    install_config_hooks()
+
+    from manimlib.__main__ import main as manim_main
+    sys.argv = [sys.argv[0]] + manim_args
+    code = 0
+    try:
+        manim_main()
+    except Exception:
+        if not args.batch:
+            raise
+        traceback.print_exc()
+        code = 1
+
+    if play_cache is not None:
+        print(f"Play cache: {play_cache.hits} hits, {play_cache.misses} misses, "
+              f"{play_cache.uncacheable} uncacheable")
+    tex_cache.print_report()
+    if still_frames is not None and still_frames.reused:
+        print(f"Still frames: {still_frames.reused} of "
+              f"{still_frames.rendered + still_frames.reused} frames of still waits reused")
+    if asset_cache is not None:
+        asset_cache.print_report()
+    if frame_writer is not None:
+        frame_writer.print_report()
+    if args.batch:
+        # Don't wait on threads or windows a scene left behind
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+if __name__ == "__main__":
+    main()
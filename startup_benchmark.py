@@ -0,0 +1,114 @@
+'''
+Times how long scenes take to start from a fresh process: importing
+their module, and getting their first frame out with -s, which for
+title cards like PartOneTitle is nearly all of their render time. Save
+a run and compare a later one against it to see what a change did:
+
+    python startup_benchmark.py prime.py mario.py -o before.json
+    python startup_benchmark.py prime.py mario.py --compare before.json
+'''
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from render_all import ROOT, get_command, select_scenes
+from scene_index import get_index
+
+# Imported lazily by the scenes that use them, see lazy_imports.py
+HEAVY_MODULES = ("scipy.special", "scipy.integrate", "scipy.optimize", "mpmath", "gym")
+
+IMPORT_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(" ".join(m for m in {heavy!r} if m in sys.modules))
+'''
+
+
+def time_import(module):
+    '''
+    Seconds it takes a fresh interpreter to import module, and which of
+    HEAVY_MODULES that pulled in.
+    '''
+    script = IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    ).stdout.splitlines()
+    if not output:
+        return None, []
+    return float(output[0]), output[1].split() if len(output) > 1 else []
+
+
+def time_first_frame(scene):
+    start = time.perf_counter()
+    code = subprocess.run(
+        get_command(scene, ["-s"]), cwd=ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    ).returncode
+    return time.perf_counter() - start if code == 0 else None
+
+
+def median(times):
+    times = [t for t in times if t is not None]
+    return statistics.median(times) if times else None
+
+
+def benchmark(scenes, repeat=3):
+    results = {}
+    for scene in scenes:
+        imports = [time_import(scene["module"]) for _ in range(repeat)]
+        results[f"{scene['module']}.{scene['name']}"] = {
+            "import": median(t for t, _ in imports),
+            "first_frame": median(time_first_frame(scene) for _ in range(repeat)),
+            "heavy_modules": imports[0][1],
+        }
+    return results
+
+
+def print_results(results, baseline=None):
+    def seconds(t):
+        return f"{t:.2f}s" if t is not None else "failed"
+
+    def speedup(name, key):
+        before = (baseline or {}).get(name, {}).get(key)
+        after = results[name][key]
+        return f"{before / after:.1f}x" if before and after else "-"
+
+    width = max([len(name) for name in results] + [5])
+    print(f"{'Scene':<{width}}  {'Import':>8}  {'First frame':>11}", end="")
+    print(f"  {'Import':>7}  {'Frame':>7}" if baseline else "", end="")
+    print("  Heavy modules")
+    for name, r in results.items():
+        print(f"{name:<{width}}  {seconds(r['import']):>8}  {seconds(r['first_frame']):>11}", end="")
+        if baseline:
+            print(f"  {speedup(name, 'import'):>7}  {speedup(name, 'first_frame'):>7}", end="")
+        print("  " + (" ".join(r["heavy_modules"]) or "-"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the startup and first frame of scenes")
+    parser.add_argument("files", nargs="*", help="modules to look in, all of them if none are given")
+    parser.add_argument("-s", "--select", nargs="+", default=["PartOneTitle"],
+                        help="scenes to time, as glob patterns, PartOneTitle by default")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="runs per scene, the median is kept")
+    parser.add_argument("-o", "--output", help="save the results to this json file")
+    parser.add_argument("--compare", help="results saved by an earlier run to compare against")
+    args = parser.parse_args()
+
+    index = get_index(ROOT)
+    scenes = select_scenes(index, args.files, patterns=args.select)
+    results = benchmark(scenes, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
@@ -0,0 +1,121 @@
+'''
+Compiles the TeX of scenes before they are rendered, so render workers
+find every literal Tex and TexText already in manimgl's Tex directory,
+which is keyed by the hash of the file compiled and shared by all of them:
+
+    python tex_cache.py zagier.py rs_codes.py -j 8
+
+Only manimgl scenes are compiled ahead of time. Cairo scenes, like
+prime.py or variational.py, compile their tex as they render through
+manim.py, which looks it up the same way once it is compiled.
+'''
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scene_index import get_index
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_tex_bodies(call):
+    '''
+    The tex files manimgl compiles for a call found by
+    SceneIndex.get_tex_calls, the whole string and then each part it is
+    broken into. Calls to the old TexMobject and TextMobject give none.
+    '''
+    from manimlib.mobject.svg.tex_mobject import SingleStringTex, Tex, TexText
+    from manimlib.utils.config_ops import digest_config
+
+    cls = {"Tex": Tex, "TexText": TexText}.get(call["class"])
+    if cls is None:
+        return []
+    kwargs = dict(call["kwargs"])
+    if "tex_to_color_map" in kwargs:
+        kwargs["tex_to_color_map"] = dict.fromkeys(kwargs["tex_to_color_map"])
+
+    tex = cls.__new__(cls)
+    digest_config(tex, kwargs)
+    tex_strings = tex.break_up_tex_strings(call["strings"])
+    bodies = [tex.get_tex_file_body(tex.arg_separator.join(tex_strings))]
+    if len(tex_strings) > 1:
+        # Same as Tex.break_up_by_substrings
+        part = SingleStringTex.__new__(SingleStringTex)
+        digest_config(part, dict(cls.CONFIG, alignment=""))
+        bodies.extend(part.get_tex_file_body(s.strip()) for s in tex_strings if s.strip())
+    return bodies
+
+
+def get_svg_path(body):
+    from manimlib.utils.directories import get_tex_dir
+    from manimlib.utils.tex_file_writing import tex_hash
+    return os.path.join(get_tex_dir(), tex_hash(body) + ".svg")
+
+
+def compile_tex(body):
+    from manimlib.utils.tex_file_writing import tex_to_svg_file
+    try:
+        tex_to_svg_file(body)
+    except BaseException:
+        # LaTeX errors exit, which shouldn't take the pool down
+        return False
+    return os.path.exists(get_svg_path(body))
+
+
+def prewarm(index, scenes, workers=None):
+    '''
+    Compiles every literal TeX string of scenes that isn't cached yet on
+    a pool of workers. Returns the number of hits, misses and failures
+    of each scene, as a dict from "module.Scene".
+    '''
+    bodies = {}
+    for scene in scenes:
+        name = f"{scene['module']}.{scene['name']}"
+        calls = index.get_tex_calls(scene["module"], scene["name"])
+        bodies[name] = {b for call in calls for b in get_tex_bodies(call)}
+
+    cached = {b for bs in bodies.values() for b in bs if os.path.exists(get_svg_path(b))}
+    missing = sorted({b for bs in bodies.values() for b in bs} - cached)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        compiled = dict(zip(missing, pool.map(compile_tex, missing, chunksize=4)))
+
+    return {
+        name: (
+            len(bs & cached),
+            sum(1 for b in bs if compiled.get(b)),
+            sum(1 for b in bs if b in compiled and not compiled[b]),
+        )
+        for name, bs in bodies.items()
+    }
+
+
+def print_report(report, wall_time):
+    width = max([len(name) for name in report] + [5])
+    print(f"{'Scene':<{width}}  {'Hits':>5}  {'Misses':>6}  {'Failed':>6}")
+    for name, (hits, misses, failed) in report.items():
+        if hits or misses or failed:
+            print(f"{name:<{width}}  {hits:>5}  {misses:>6}  {failed:>6}")
+    hits, misses, failed = (sum(r[i] for r in report.values()) for i in range(3))
+    print(f"\n{hits} cached, {misses} compiled, {failed} failed in {wall_time:.1f}s")
+
+
+if __name__ == "__main__":
+    from render_all import select_scenes
+
+    parser = argparse.ArgumentParser(description="Compile the TeX of scenes ahead of rendering them")
+    parser.add_argument("files", nargs="*", help="modules to look in, all of them if none are given")
+    parser.add_argument("-b", "--base", nargs="+", help="only scenes deriving from these classes")
+    parser.add_argument("-s", "--select", nargs="+", help="only scenes matching these glob patterns")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    # manimgl reads custom_config.yml from the working directory
+    os.chdir(ROOT)
+    index = get_index(ROOT)
+    scenes = [
+        s for s in select_scenes(index, args.files, args.base, args.select)
+        if s["api"] == "gl"
+    ]
+    start = time.time()
+    print_report(prewarm(index, scenes, args.workers), time.time() - start)
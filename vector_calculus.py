@@ -0,0 +1,186 @@
+from manimlib.imports import *
+
+
+class BatchedVectorField(VGroup):
+    """
+    The colored vector fields from calc_field_color, built all at once.
+    vect is evaluated over the whole grid, the arrows are normalized and
+    bucketed into color_list with numpy, and every arrow is stored in the
+    points of one VMobject per color. Each of those holds an arrow for
+    every grid point, collapsed to a point when the arrow belongs to a
+    different color, so two fields on the same grid transform arrow by
+    arrow inside a handful of arrays. Transform pairs submobjects by
+    position, so every color keeps its VMobject even when it has no arrow.
+    """
+    CONFIG = {
+        "color_list": ['#e22b2b', '#e88e10', '#eae600', '#88ea00',
+                       '#00eae2', '#0094ea', "#2700ea", '#bf00ea', '#ea0078'],
+        "prop": 0,
+        "x_range": (-5, 5),
+        "y_range": (-5, 5),
+        "step": 1,
+        "length": 1 / 1.5,
+        "tip_length": 0.25 / 1.5,
+        "arrow_stroke_width": 5 / 1.5,
+        "opacity": None,
+    }
+
+    def __init__(self, vect, **kwargs):
+        VGroup.__init__(self, **kwargs)
+        self.vect = vect
+
+        xs, ys = np.meshgrid(
+            np.arange(*self.x_range, self.step),
+            np.arange(*self.y_range, self.step),
+            indexing="ij",
+        )
+        self.bases = np.stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)], axis=1)
+
+        values = self.evaluate(xs.ravel(), ys.ravel())
+        magnitudes = np.sqrt((values ** 2).sum(axis=1))
+        directions = np.zeros_like(values)
+        nonzero = magnitudes != 0
+        directions[nonzero] = values[nonzero] / magnitudes[nonzero, None]
+
+        buckets = np.minimum(
+            (magnitudes / 10 ** self.prop).astype(int), len(self.color_list) - 1)
+        arrows = self.get_arrow_points(directions)
+        collapsed = np.repeat(self.bases[:, None, :], arrows.shape[1], axis=1)
+
+        fill_opacity = 1 if self.opacity is None else self.opacity
+        for i, color in enumerate(self.color_list):
+            points = np.where((buckets == i)[:, None, None], arrows, collapsed)
+            sub = VMobject(
+                stroke_color=color,
+                stroke_width=self.arrow_stroke_width,
+                fill_color=color,
+                fill_opacity=fill_opacity,
+            )
+            sub.set_points(points.reshape(-1, 3))
+            self.add(sub)
+
+    def evaluate(self, xs, ys):
+        # Most fields work on whole arrays, the rest (like ones
+        # returning a constant component) are called point by point
+        try:
+            values = self.vect(xs, ys)
+            vx, vy = np.broadcast_arrays(values[0], values[1], xs)[:2]
+        except (ValueError, TypeError):
+            values = np.array([self.vect(x, y)[:2] for x, y in zip(xs, ys)])
+            vx, vy = values[:, 0], values[:, 1]
+        return np.stack([vx, vy], axis=1).astype(float)
+
+    def get_arrow_points(self, directions):
+        """
+        Cubic bezier points of every arrow, a line followed by a
+        triangular tip, with shape (num_arrows, 16, 3).
+        """
+        d = np.zeros((len(directions), 3))
+        d[:, :2] = directions
+        n = np.stack([-d[:, 1], d[:, 0], d[:, 2]], axis=1)
+
+        start = self.bases
+        tip_base = start + d * (self.length - self.tip_length)
+        tip = start + d * self.length
+        left = tip_base + n * self.tip_length / 2
+        right = tip_base - n * self.tip_length / 2
+
+        corners = [(start, tip_base), (tip, left), (left, right), (right, tip)]
+        curves = [
+            np.stack([a, interpolate(a, b, 1 / 3), interpolate(a, b, 2 / 3), b], axis=1)
+            for a, b in corners
+        ]
+        return np.concatenate(curves, axis=1)
+
+
+class StreamingLineIntegral(VGroup):
+    """
+    The integrand of a line integral over the curve func(t) through the
+    field vect, drawn as a graph that grows as t advances, with the area
+    under it shaded and a running sum of the integral.
+
+    Both the graph and the area are preallocated point arrays with a slot
+    per segment. Slots that haven't been reached are collapsed onto the
+    start point, so advancing t only writes the new segments and the
+    per frame cost doesn't depend on how far along the animation is.
+
+    kind="circulation" integrates F(r(t)) . r'(t), kind="flux" integrates
+    F(r(t)) . n(t) with n(t) = (y'(t), -x'(t)).
+    """
+    CONFIG = {
+        "t_min": -3,
+        "t_max": 3,
+        "num_segments": 600,
+        "kind": "circulation",
+        "origin": ORIGIN,
+        "scale_factor": 1,
+        "graph_color": RED,
+        "graph_stroke_width": 8,
+        "area_color": YELLOW,
+        "area_opacity": 0.5,
+        "derivative_dt": 1e-5,
+    }
+
+    def __init__(self, func, vect, **kwargs):
+        VGroup.__init__(self, **kwargs)
+        self.func = func
+        self.vect = vect
+
+        self.ts = np.linspace(self.t_min, self.t_max, self.num_segments + 1)
+        self.values = np.array([self.integrand(t) for t in self.ts])
+        dt = self.ts[1] - self.ts[0]
+        self.sums = np.concatenate(
+            [[0], np.cumsum((self.values[1:] + self.values[:-1]) / 2 * dt)])
+
+        ys = self.values * self.scale_factor
+        self.graph_points = self.origin + np.stack(
+            [self.ts, ys, np.zeros_like(ys)], axis=1)
+        self.base_points = self.origin + np.stack(
+            [self.ts, np.zeros_like(ys), np.zeros_like(ys)], axis=1)
+
+        start = self.graph_points[0]
+        self.graph = VMobject(
+            stroke_color=self.graph_color,
+            stroke_width=self.graph_stroke_width,
+        )
+        self.graph.set_points(np.repeat([start], 4 * self.num_segments, axis=0))
+        self.area = VMobject(
+            stroke_width=0,
+            fill_color=self.area_color,
+            fill_opacity=self.area_opacity,
+        )
+        self.area.set_points(np.repeat([start], 16 * self.num_segments, axis=0))
+
+        self.num_drawn = 0
+        self.t = self.t_min
+        self.add(self.area, self.graph)
+
+    def integrand(self, t):
+        h = self.derivative_dt
+        point = self.func(t)
+        d_point = (self.func(t + h) - self.func(t - h)) / (2 * h)
+        field = np.array(self.vect(point[0], point[1]))[:2]
+        if self.kind == "flux":
+            return np.dot(field, [d_point[1], -d_point[0]])
+        return np.dot(field, d_point[:2])
+
+    def set_t(self, t):
+        self.t = np.clip(t, self.t_min, self.t_max)
+        n = int(np.searchsorted(self.ts, self.t, side="right")) - 1
+        n = min(n, self.num_segments)
+
+        graph, area = self.graph.points, self.area.points
+        for k in range(self.num_drawn, n):
+            a, b = self.graph_points[k], self.graph_points[k + 1]
+            graph[4 * k:4 * k + 4] = [a, interpolate(a, b, 1 / 3), interpolate(a, b, 2 / 3), b]
+
+            corners = [self.base_points[k], a, b, self.base_points[k + 1], self.base_points[k]]
+            for i in range(4):
+                c, d = corners[i], corners[i + 1]
+                area[16 * k + 4 * i:16 * k + 4 * i + 4] = [
+                    c, interpolate(c, d, 1 / 3), interpolate(c, d, 2 / 3), d]
+        self.num_drawn = max(self.num_drawn, n)
+        return self
+
+    def get_value(self):
+        return np.interp(self.t, self.ts, self.sums)
@@ -1,5 +1,4 @@
 from manimlib import *
-from itertools import product
 
 YELLOW_Z = "#e2e1a4"
 
@@ -17,12 +16,114 @@ A_UNKA = "#ccebc5"
 A_UNKB = "#ffed6f"
 
 
-def get_windmills(n):
-    return [
-        (x, y, z)
-        for (x, y, z) in product(range(1, n), repeat=3)
-        if x**2 + 4 * y * z == n
-    ]
+_spf = np.zeros(0, dtype=np.int64)
+
+
+def get_smallest_prime_factors(limit):
+    """
+    Smallest prime factor of every integer up to limit. The table is
+    kept between calls and rebuilt twice as large when it runs out.
+    """
+    global _spf
+    if len(_spf) <= limit:
+        size = max(limit + 1, 2 * len(_spf))
+        spf = np.arange(size, dtype=np.int64)
+        for p in range(2, int(size**0.5) + 1):
+            if spf[p] == p:
+                block = spf[p * p :: p]
+                block[block == np.arange(p * p, size, p)] = p
+        _spf = spf
+    return _spf
+
+
+def get_divisors(m):
+    spf = get_smallest_prime_factors(m)
+    divisors = [1]
+    while m > 1:
+        p, k = int(spf[m]), 0
+        while m % p == 0:
+            m //= p
+            k += 1
+        divisors = [d * p**e for d in divisors for e in range(k + 1)]
+    return sorted(divisors)
+
+
+def zagier_map(x, y, z):
+    if x < y - z:
+        return (x + 2 * z, z, y - x - z)
+    if x < 2 * y:
+        return (2 * y - x, y, x - y + z)
+    return (x - 2 * y, x - y + z, y)
+
+
+def flip_map(x, y, z):
+    return (x, z, y)
+
+
+def get_orbits(windmills, func):
+    orbits, seen = [], set()
+    for w in windmills:
+        if w in seen:
+            continue
+        orbit = [w]
+        while func(*orbit[-1]) != w:
+            orbit.append(func(*orbit[-1]))
+        seen.update(orbit)
+        orbits.append(orbit)
+    return orbits
+
+
+def get_windmills(n, with_orbits=False):
+    """
+    All (x, y, z) with x^2 + 4yz = n, sorted. For every x with
+    n - x^2 = 4m, each divisor y of m gives one windmill.
+
+    With with_orbits=True, the orbits of the Zagier map and the flip
+    map over these windmills are returned as well.
+    """
+    windmills = []
+    x = 1
+    while x * x < n:
+        if (n - x * x) % 4 == 0:
+            m = (n - x * x) // 4
+            windmills.extend((x, y, m // y) for y in get_divisors(m))
+        x += 1
+
+    if not with_orbits:
+        return windmills
+    return windmills, {
+        "zagier": get_orbits(windmills, zagier_map),
+        "flip": get_orbits(windmills, flip_map),
+    }
+
+
+class GridLines(VMobject):
+    """
+    Every line of a height x width grid in one VMobject, one subpath per
+    line. The whole grid is a single points array, so copying it or
+    transforming it is one array operation instead of one per Line.
+    """
+
+    def __init__(self, height, width, freq=1, **kwargs):
+        self.grid_height = height
+        self.grid_width = width
+        self.freq = freq
+        super().__init__(**kwargs)
+
+    def init_points(self):
+        h, w = self.grid_height, self.grid_width
+        starts = [[-w / 2, i, 0] for i in np.arange(-h / 2, h / 2, self.freq)]
+        ends = [[w / 2, i, 0] for i in np.arange(-h / 2, h / 2, self.freq)]
+        starts += [[i, h / 2, 0] for i in np.arange(-w / 2, w / 2, self.freq)]
+        ends += [[i, -h / 2, 0] for i in np.arange(-w / 2, w / 2, self.freq)]
+
+        starts = np.array(starts, dtype=float).reshape(-1, 3)
+        ends = np.array(ends, dtype=float).reshape(-1, 3)
+        points = np.zeros((3 * len(starts), 3))
+        points[0::3] = starts
+        points[1::3] = (starts + ends) / 2
+        points[2::3] = ends
+        self.set_points(points)
 
 
 class GridRectangle(VGroup):
@@ -32,17 +133,7 @@ class GridRectangle(VGroup):
         super().__init__(*args, **kwargs)
 
         self.rect = Rectangle(height=height, width=width, **rect_kwargs)
-        self.lines = VGroup()
-
-        for i in np.arange(-height / 2, height / 2, freq):
-            self.lines.add(
-                Line(LEFT * width / 2, RIGHT * width / 2, **line_kwargs).shift(i * UP)
-            )
-
-        for i in np.arange(-width / 2, width / 2, freq):
-            self.lines.add(
-                Line(UP * height / 2, DOWN * height / 2, **line_kwargs).shift(i * RIGHT)
-            )
+        self.lines = GridLines(height, width, freq=freq, **line_kwargs)
 
         self.add(self.rect, self.lines)
 
@@ -0,0 +1,130 @@
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+ZEROS_TEXT = "zeros.txt"
+ZEROS_TABLE = "zeros.npy"
+CHUNK_SIZE = 100000
+
+_tables = {}
+
+
+def iter_text_zeros(file_name):
+    '''
+    Imaginary parts of zeros from a text file with one zero per line,
+    like zeros.txt or Odlyzko's tables, in chunks of CHUNK_SIZE.
+    '''
+    chunk = []
+    with open(file_name) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                chunk.append(float(line))
+            if len(chunk) == CHUNK_SIZE:
+                yield np.array(chunk)
+                chunk = []
+    if chunk:
+        yield np.array(chunk)
+
+
+def compute_zeros(start, stop):
+    '''
+    Zeros start+1 to stop, computed with mpmath. This is slow, use a
+    precomputed table for anything past a few thousand zeros.
+    '''
+    from mpmath import zetazero
+    return np.array([float(zetazero(n).imag) for n in range(start + 1, stop + 1)])
+
+
+def count_text_zeros(sources, limit=None):
+    '''
+    How many zeros the text files in sources hold, up to limit, without
+    parsing them.
+    '''
+    total = 0
+    for source in sources:
+        with open(source) as f:
+            for line in f:
+                if line.strip():
+                    total += 1
+                    if total == limit:
+                        return total
+    return total
+
+
+def build_table(sources=(ZEROS_TEXT,), count=None, table=ZEROS_TABLE):
+    '''
+    Writes the zeros from the text files in sources, one after the other,
+    into a .npy table of float64, a chunk at a time. If count is more than
+    the files hold, the rest are computed with mpmath. The table is
+    written to a temporary file of its own and moved in place, so
+    processes building it at the same time don't clash.
+    '''
+    size = count_text_zeros(sources, count)
+    if count is not None:
+        size = count
+
+    temp = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(table)), suffix=".npy.tmp", delete=False)
+    temp.close()
+    try:
+        out = np.lib.format.open_memmap(temp.name, mode="w+", dtype=np.float64, shape=(size,))
+        i = 0
+        for source in sources:
+            for chunk in iter_text_zeros(source):
+                chunk = chunk[:size - i]
+                out[i:i + len(chunk)] = chunk
+                i += len(chunk)
+                if i == size:
+                    break
+            if i == size:
+                break
+        if i < size:
+            out[i:] = compute_zeros(i, size)
+        out.flush()
+        del out
+        os.replace(temp.name, table)
+    except BaseException:
+        os.remove(temp.name)
+        raise
+
+    _tables.pop(table, None)
+    return size
+
+
+def get_table(table=ZEROS_TABLE):
+    '''
+    The whole zero table, memory-mapped. It is built from zeros.txt
+    the first time if it doesn't exist yet.
+    '''
+    if table not in _tables:
+        if not os.path.exists(table):
+            build_table(table=table)
+        _tables[table] = np.load(table, mmap_mode="r")
+    return _tables[table]
+
+
+def load_zeros(num_zeros, table=ZEROS_TABLE):
+    '''
+    Imaginary parts of the first num_zeros nontrivial zeros of zeta,
+    as a view into the memory-mapped table.
+    '''
+    zeros = get_table(table)
+    if num_zeros > len(zeros):
+        raise ValueError(
+            f"{table} only holds {len(zeros)} zeros, not {int(num_zeros)}, "
+            f"build a larger one with python zeta_zeros.py -n {int(num_zeros)}")
+    return zeros[:int(num_zeros)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the binary zeta zero table")
+    parser.add_argument("sources", nargs="*", default=[ZEROS_TEXT])
+    parser.add_argument("-n", "--count", type=int, default=None)
+    parser.add_argument("-o", "--output", default=ZEROS_TABLE)
+    args = parser.parse_args()
+
+    size = build_table(args.sources, args.count, args.output)
+    print(f"Wrote {size} zeros to {args.output}")